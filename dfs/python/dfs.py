@@ -1,14 +1,15 @@
-import pandas as pd
 import networkx as nx
 import matplotlib.pyplot as plt
 import time
+from array import array
 
 from graph import graph, vertex, edge
 
-def dfs(gr, orig, dest, edges=[]):
+def dfs_ids(gr, orig, dest):
     """
-    DFS algorithm. Finds path between origin and destionation
-    
+    DFS algorithm returning the ids of the edges on the path, positions in gr.get_edges()
+    and indices into the edge attributes of the graph, see dfs
+
     Args:
         gr: graph
             Graph we are working with
@@ -20,92 +21,141 @@ def dfs(gr, orig, dest, edges=[]):
             Destination vertex
     
     Result:
-        edges: edge
-            Edges passed to go from origin to destination
+        ids: list of int
+            Ids of the edges passed to go from origin to destination, in order.
+            Empty if destination is not reachable
     """
 
     if not isinstance(gr, graph):
         raise AssertionError("gr must be graph")
 
-    if isinstance(orig, str):
-        orig = gr.get_vertex(orig)
-    
-    if isinstance(dest, str):
-        dest = gr.get_vertex(dest)
+    if isinstance(orig, vertex):
+        orig = orig.get_label()
 
-    if not isinstance(orig, vertex) or not isinstance(dest, vertex):
+    if isinstance(dest, vertex):
+        dest = dest.get_label()
+
+    csr = gr.freeze()
+    s = csr.get_id(orig) if isinstance(orig, str) else None
+    t = csr.get_id(dest) if isinstance(dest, str) else None
+
+    if s is None or t is None:
         raise AssertionError("orig and dest must be vertecies and must be presented in graph")
 
-    orig.visit()
+    indptr, indices = csr.indptr, csr.indices
+
+    visited = bytearray(csr.vertex_count())
+    parent  = array("q", [-1]) * csr.vertex_count()
+    prev    = array("q", [-1]) * csr.vertex_count()
+    nxt     = indptr[:-1]
+
+    def reaches_dest(u):
+        for a in range(indptr[u], indptr[u + 1]):
+            if indices[a] == t:
+                parent[t], prev[t] = a, u
+                return True
+        return False
+
+    visited[s] = 1
+    stack = [s]
+    found = reaches_dest(s)
+
+    while stack and not found:
+        u = stack[-1]
+        a = nxt[u]
+        if a == indptr[u + 1]:
+            stack.pop()
+            continue
+
+        nxt[u] = a + 1
+        v = indices[a]
+        if not visited[v]:
+            visited[v] = 1
+            parent[v], prev[v] = a, u
+            stack.append(v)
+            found = reaches_dest(v)
+
+    if not found:
+        return []
+
+    path = []
+    v = t
+    while True:
+        path.append(csr.edge_ids[parent[v]])
+        v = prev[v]
+        if v == s:
+            break
+
+    return path[::-1]
+
+
+def dfs(gr, orig, dest):
+    """
+    DFS algorithm. Finds path between origin and destionation.
+    The search runs on the frozen graph and keeps its state per call,
+    so it can be repeated any number of times on the same graph
 
-    if dest in gr.adjacent_vertices(orig):
-        dest.visit()
-        edges.append(gr.get_edge(orig, dest))
-    else:
-        for v in gr.adjacent_vertices(orig):
-            if not v.is_visited():
-                dfs(gr, v, dest)
-                if dest.is_visited():
-                    edges.append(gr.get_edge(orig, v))
-                    return edges
-                # edges.append(dfs(gr, v, dest)[-1])
+    Args:
+        gr: graph
+            Graph we are working with
+        
+        orig: vertex or str
+            Origin vertex
 
-    return edges
+        dest: vertex or str
+            Destination vertex
+    
+    Result:
+        edges: list of edge
+            Edges passed to go from origin to destination, in order.
+            Empty if destination is not reachable
+    """
+    edges = gr.get_edges()
+    return [edges[i] for i in dfs_ids(gr, orig, dest)]
 
 # filename = "cities_in_az.csv"
 filename = "airports.csv"
-gr = graph()
-
-data = pd.read_csv(filename)
 
 if filename == "cities_in_az.csv":
-    for i in range(len(data)):
-        d = data.loc[i].values
-
-        v1 = gr.add_vertex(d[0])
-        v2 = gr.add_vertex(d[1])
-
-        gr.add_edge(v1, v2, d[2], label=f"{d[0]}_{d[1]}")
+    gr = graph.from_csv(filename, source="Origin", target="Destiny", weight="Hours", label=lambda o, d: f"{o}_{d}", chunksize=100000)
 
     begin = time.time()
-    res = dfs(gr, "Baku", "Goychay")[::-1]
+    ids = dfs_ids(gr, "Baku", "Goychay")
     end = time.time()
     print(f"Time spent: {end - begin}s")
 
-    for e in res:
-        print(e)
+    for i in ids:
+        print(gr.get_edges()[i])
 
-    cost = sum([e.get_weight() for e in res])
+    cost = gr.path_costs([ids])[0]
     print(f"Total cost of path: {cost}")
 
-    g = nx.from_pandas_edgelist(data, source="Origin", target="Destiny", edge_attr=True)
+    g = nx.Graph()
+    g.add_weighted_edges_from(((*(v.get_label() for v in e.get_endpoints()), e.get_weight()) for e in gr.get_edges()), weight="Hours")
     plt.figure()
     nx.draw_networkx(g, with_labels=True)
     plt.show()
 
 elif filename == "airports.csv":
-    for i in range(len(data)):
-        d = data.loc[i].values
-
-        v1 = gr.add_vertex(d[9])
-        v2 = gr.add_vertex(d[10])
-
-        gr.add_edge(v1, v2, int(d[11]), label=f"{d[9]}_{d[10]}")
+    gr = graph.from_csv(filename, source="Origin", target="Dest", weight="Distance", label=lambda o, d: f"{o}_{d}", chunksize=100000,
+                        attributes={"AirTime": "AirTime"})
 
     begin = time.time()
-    res = dfs(gr, "IAD", "CRP")[::-1]
+    ids = dfs_ids(gr, "IAD", "CRP")
     end = time.time()
     print(f"Time spent: {end - begin}s")
 
+    res = [gr.get_edges()[i] for i in ids]
     for e in res:
         print(e)
 
-    arr_t = sum([data[(data["Origin"] == e.get_endpoints()[0].get_label()) & (data["Dest"] == e.get_endpoints()[1].get_label()) & (data["Distance"] == e.get_weight())].reset_index(drop=True)["AirTime"].values[0] for e in res])
+    arr_t = gr.path_costs([ids], "AirTime")[0]
     print(f"Total arrival time of the path: {arr_t}")
-    dist = sum([e.get_weight() for e in res])
+    dist = gr.path_costs([ids])[0]
     print(f"Cumulative distance of the path: {dist}")
 
-    g = nx.from_pandas_edgelist(data, source="Origin", target="Dest", edge_attr="Distance")
+    g = nx.Graph()
+    g.add_weighted_edges_from(((*(v.get_label() for v in e.get_endpoints()), e.get_weight()) for e in gr.get_edges()), weight="Distance")
     plt.figure()
     nx.draw_networkx(g, with_labels=True)
     plt.show()
\ No newline at end of file
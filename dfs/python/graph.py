@@ -1,4 +1,37 @@
+import mmap
+import struct
+import sys
+from array import array
+from itertools import chain, islice
+
+
+# Magic, version, flags, vertex count, arc count and size of the label table of a saved csr_graph,
+# padded to 40 bytes so the arrays after it are aligned to 8 bytes
+_HEADER  = struct.Struct("<4sII4xqqq")
+_VERSION = 2
+_MAGIC   = b"CSRG"
+_DIRECTED, _EDGE_IDS, _BIG_ENDIAN = 1, 2, 4
+
+
+def _number(value):
+    """
+    Parses a weight read as text, leaving numbers as they are. Empty text and None are missing, nan
+    """
+    if value is None:
+        return float("nan")
+    if not isinstance(value, str):
+        return value
+    if not value:
+        return float("nan")
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
 class vertex:
+    __slots__ = ("__label", "__visited")
+
     def __init__(self, label, visited=False):
         """
         Vertex object
@@ -41,7 +74,9 @@ class vertex:
 
 
 class edge:
+    __slots__ = ("__endpoints", "__weight", "__label", "__number")
     __edge_count = 0
+
     def __init__(self, endpoints, weight=0, label=None):
         """
         Edge object
@@ -59,46 +94,311 @@ class edge:
         if len(endpoints) != 2 or not isinstance(endpoints[0], vertex) or not isinstance(endpoints[1], vertex):
             raise AssertionError("endpoints must contain 2 instances of vertex class")
 
-        if not isinstance(weight, int) and not isinstance(weight, float):
+        if not isinstance(weight, (int, float)):
             raise AssertionError("weight must be either int or float")
 
         self.__endpoints = endpoints
         self.__weight    = weight
         self.__label     = label
-        if label is None:
-            self.__label = f"edge_{edge.__edge_count}"
+        self.__number    = edge.__edge_count
         edge.__edge_count += 1
 
     
+    @staticmethod
+    def key(v1, v2, weight):
+        """
+        Returns the hashable key identifying an edge from v1 to v2 with the given weight.
+        Missing (nan) weights all share one key, as nan is not equal to itself
+
+        Args:
+            v1, v2: vertex
+                Endpoints of the edge, in order
+
+            weight: int or float
+                Weight of the edge
+        """
+        return (v1, v2, None if weight != weight else weight)
+
+    
     def get_endpoints(self):
         return self.__endpoints
 
+
+    def get_label(self):
+        """
+        Returns the label of the edge, edge_x if none was given
+        """
+        return f"edge_{self.__number}" if self.__label is None else self.__label
+
     
     def get_weight(self):
         return self.__weight
 
 
     def __repr__(self):
-        return f"{self.__label}: {self.__endpoints[0]} -> {self.__endpoints[1]} ({self.__weight})"
+        return f"{self.get_label()}: {self.__endpoints[0]} -> {self.__endpoints[1]} ({self.__weight})"
 
 
     def __str__(self):
-        return f"{self.__label}: {self.__endpoints[0]} -> {self.__endpoints[1]} ({self.__weight})"
+        return f"{self.get_label()}: {self.__endpoints[0]} -> {self.__endpoints[1]} ({self.__weight})"
 
     
+    def __hash__(self):
+        return hash(edge.key(self.__endpoints[0], self.__endpoints[1], self.__weight))
+
+
     def __eq__(self, other):
         return (isinstance(other, edge) and                                                                      \
                (self.__endpoints[0] == other.__endpoints[0] and self.__endpoints[1] == other.__endpoints[1]) and \
                 self.__weight == other.__weight)
 
 
+class csr_graph:
+    __slots__ = ("labels", "index", "indptr", "indices", "weights", "edge_ids", "directed", "cache", "__tails", "__reverse")
+
+    def __init__(self, labels, indptr, indices, weights, edge_ids=None, directed=True):
+        """
+        Frozen graph in compressed sparse row form. Vertices are identified by
+        integer ids, arcs leaving vertex u are stored at positions indptr[u]:indptr[u + 1]
+
+        Args:
+            labels: list of str
+                Labels of the vertices, indexed by vertex id
+
+            indptr: array of int
+                Offsets of the arcs of every vertex, of length len(labels) + 1
+
+            indices: array of int
+                Head vertex id of every arc
+
+            weights: array of float
+                Weight of every arc
+
+            edge_ids: array of int, default: None
+                Position of the edge every arc comes from in the edge list of the source graph
+
+            directed: bool, default: True
+                Whether every edge is stored as a single arc or as a pair of opposite arcs
+
+        Results derived from the arcs, such as shortest path trees, may be kept in the cache dict.
+        A graph freezes into a new csr_graph after every modification, so the cache never goes stale
+        """
+        self.labels   = labels
+        self.index    = {label: i for i, label in enumerate(labels)}
+        self.indptr   = indptr
+        self.indices  = indices
+        self.weights  = weights
+        self.edge_ids = edge_ids
+        self.directed = directed
+        self.cache    = dict()
+        self.__tails   = None
+        self.__reverse = None
+
+
+    def freeze(self):
+        """
+        Returns the graph itself, so algorithms can call freeze() on either form
+        """
+        return self
+
+
+    def vertex_count(self):
+        return len(self.labels)
+
+
+    def arc_count(self):
+        return len(self.indices)
+
+
+    def get_id(self, label):
+        """
+        Get vertex id by label
+
+        Args:
+            label: str or vertex
+                Label of the vertex, or the vertex itself
+
+        Returns:
+            id: int
+                Id of the vertex with the given label. If there is no such vertex returns None
+        """
+        if isinstance(label, vertex):
+            label = label.get_label()
+        return self.index.get(label)
+
+
+    def get_label(self, u):
+        return self.labels[u]
+
+
+    def arcs(self, u):
+        """
+        Returns the range of positions of the arcs leaving vertex u
+        """
+        return range(self.indptr[u], self.indptr[u + 1])
+
+
+    def adjacent(self, u):
+        """
+        Returns the ids of the heads of the arcs leaving vertex u
+        """
+        return self.indices[self.indptr[u]:self.indptr[u + 1]]
+
+
+    def degree(self, u):
+        return self.indptr[u + 1] - self.indptr[u]
+
+
+    def tails(self):
+        """
+        Returns the tail vertex id of every arc. Computed on first use
+        """
+        if self.__tails is None:
+            tails = array("q", bytes(8 * self.arc_count()))
+            for u in range(self.vertex_count()):
+                for a in range(self.indptr[u], self.indptr[u + 1]):
+                    tails[a] = u
+            self.__tails = tails
+        return self.__tails
+
+
+    def transpose(self):
+        """
+        Returns the graph with every arc reversed, sharing labels and edge ids
+        with this one. An undirected graph is its own transpose. Computed on first use
+        """
+        if not self.directed:
+            return self
+
+        if self.__reverse is None:
+            n, tails = self.vertex_count(), self.tails()
+            indptr = array("q", bytes(8 * (n + 1)))
+            for v in self.indices:
+                indptr[v + 1] += 1
+            for i in range(n):
+                indptr[i + 1] += indptr[i]
+
+            arcs     = self.arc_count()
+            indices  = array("q", bytes(8 * arcs))
+            weights  = array("d", bytes(8 * arcs))
+            edge_ids = array("q", bytes(8 * arcs)) if self.edge_ids is not None else None
+            fill     = indptr[:-1]
+
+            for a in range(arcs):
+                v = self.indices[a]
+                b = fill[v]
+                indices[b], weights[b] = tails[a], self.weights[a]
+                if edge_ids is not None:
+                    edge_ids[b] = self.edge_ids[a]
+                fill[v] += 1
+
+            reverse = csr_graph(self.labels, indptr, indices, weights, edge_ids, True)
+            reverse.index = self.index
+            reverse.__reverse = self
+            self.__reverse = reverse
+        return self.__reverse
+
+
+    def save(self, path):
+        """
+        Writes the graph to a binary file that load maps back into memory. The file holds a
+        header, the arrays indptr, indices, weights and edge_ids as raw machine words and the
+        table of vertex labels. Edges themselves are not saved, edge ids only refer to the
+        edge list of the graph this one was frozen from
+
+        Args:
+            path: str
+                Path of the file to write
+        """
+        data    = [label.encode("utf-8") for label in self.labels]
+        offsets = array("q", bytes(8 * (len(data) + 1)))
+        for i, label in enumerate(data):
+            offsets[i + 1] = offsets[i] + len(label)
+
+        flags = (_DIRECTED if self.directed else 0) | (_BIG_ENDIAN if sys.byteorder == "big" else 0)
+        if self.edge_ids is not None:
+            flags |= _EDGE_IDS
+
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, flags, self.vertex_count(), self.arc_count(), offsets[-1]))
+            for arr in (self.indptr, self.indices, self.weights, self.edge_ids, offsets):
+                if arr is not None:
+                    f.write(memoryview(arr).cast("B"))
+            f.write(b"".join(data))
+
+
+    @classmethod
+    def load(cls, path):
+        """
+        Opens a graph written by save. The arrays are memory-mapped read-only instead of
+        being read, so loading only decodes the vertex labels and processes opening the
+        same file share its pages
+
+        Args:
+            path: str
+                Path of the file to open
+
+        Returns:
+            graph: csr_graph
+                Graph backed by the file
+        """
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, flags, n, arcs, size = _HEADER.unpack_from(buffer)
+        if magic != _MAGIC or version != _VERSION:
+            raise AssertionError("path must be a graph written by csr_graph.save")
+        if bool(flags & _BIG_ENDIAN) != (sys.byteorder == "big"):
+            raise AssertionError("The graph was saved on a machine of different byte order")
+
+        view   = memoryview(buffer)
+        offset = _HEADER.size
+
+        def section(typecode, count):
+            nonlocal offset
+            start, offset = offset, offset + 8 * count
+            return view[start:offset].cast(typecode)
+
+        indptr   = section("q", n + 1)
+        indices  = section("q", arcs)
+        weights  = section("d", arcs)
+        edge_ids = section("q", arcs) if flags & _EDGE_IDS else None
+        offsets  = section("q", n + 1)
+
+        data   = buffer[offset:offset + size]
+        labels = [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(n)]
+
+        gr = cls(labels, indptr, indices, weights, edge_ids, bool(flags & _DIRECTED))
+        gr.cache["mmap"] = (path, buffer)
+        return gr
+
+
+    def __repr__(self):
+        return f"csr_graph({self.vertex_count()} vertices, {self.arc_count()} arcs)"
+
+
 class graph:
-    def __init__(self):
+    def __init__(self, multigraph=False):
         """
         Graph object
+
+        Args:
+            multigraph: bool, default: False
+                Whether edges equal to an edge of the graph are added as parallel edges instead of being dropped
         """
+        self.__multigraph = multigraph
+        self.__attributes = dict()
         self.__vertices = dict()
+        self.__predecessors = dict()
+        self.__labels   = dict()
         self.__edges = []
+        self.__edge_index = dict()
+        self.__frozen = None
+        self.__loops = 0
+        self.__pairs = dict()
+        self.__parallel = 0
+        self.__degrees = {0: 0}
+        self.__arcs = dict()
 
     
     def get_vertex(self, label):
@@ -116,11 +416,7 @@ class graph:
         if not isinstance(label, str):
             raise AssertionError("Label must be str")
 
-        for v in self.__vertices.keys():
-            if v.get_label() == label:
-                return v
-
-        return None
+        return self.__labels.get(label)
 
 
     def get_edge(self, v1, v2):
@@ -145,12 +441,123 @@ class graph:
         if v1 not in self.__vertices.keys() or v2 not in self.__vertices.keys():
             raise AssertionError("v1 and v2 must be in the graph")
 
-        for e in self.__edges:
-            endpoints = e.get_endpoints()
-            if endpoints[0] == v1 and endpoints[1] == v2:
-                return e
+        return self.__arcs.get((v1, v2))
 
-        return None
+
+    def get_edges(self):
+        """
+        Returns the list of edges in the order they were added. Edge ids of
+        a frozen graph are positions in this list
+        """
+        return self.__edges
+
+
+    def is_multigraph(self):
+        return self.__multigraph
+
+
+    def attributes(self):
+        """
+        Returns the names of the numeric attributes stored for the edges
+        """
+        return list(self.__attributes)
+
+
+    def get_attribute(self, name):
+        """
+        Get an attribute of every edge
+
+        Args:
+            name: str
+                Name of the attribute
+
+        Returns:
+            values: array of float
+                Value of the attribute for every edge, indexed by edge id. Missing values are nan
+        """
+        if name not in self.__attributes:
+            raise AssertionError("The graph has no edge attribute with this name")
+
+        return self.__attributes[name]
+
+
+    def set_attribute(self, name, values):
+        """
+        Stores an attribute of every edge
+
+        Args:
+            name: str
+                Name of the attribute
+
+            values: sequence of int or float
+                Value of the attribute for every edge, indexed by edge id
+        """
+        if not isinstance(name, str) or name == "weight":
+            raise AssertionError("name must be str other than \"weight\"")
+
+        if len(values) != len(self.__edges):
+            raise AssertionError("values must have a value for every edge")
+
+        self.__attributes[name] = array("d", values)
+        self.__frozen = None
+
+
+    def path_costs(self, paths, weight=None):
+        """
+        Computes the total cost of many paths at once by gathering the weights of their
+        edges from a column indexed by edge id. Requires numpy
+
+        Args:
+            paths: sequence of sequence of int, or 2d array of int
+                Edge ids of every path, see get_edges. Paths may have different lengths
+
+            weight: str, default: None
+                Name of an edge attribute to sum instead of the edge weight
+
+        Returns:
+            costs: numpy array of float
+                Total cost of every path, 0 for empty paths
+        """
+        import numpy as np
+
+        if weight is None or weight == "weight":
+            csr = self.freeze()
+            if "edge_weights" not in csr.cache:
+                csr.cache["edge_weights"] = array("d", (e.get_weight() for e in self.__edges))
+            column = csr.cache["edge_weights"]
+        else:
+            column = self.get_attribute(weight)
+
+        values = np.frombuffer(column, dtype=np.float64)
+
+        if isinstance(paths, np.ndarray) and paths.ndim == 2:
+            return values[paths].sum(axis=1)
+
+        lengths = np.fromiter(map(len, paths), dtype=np.int64, count=len(paths))
+        ids     = np.fromiter(chain.from_iterable(paths), dtype=np.int64, count=int(lengths.sum()))
+        owners  = np.repeat(np.arange(len(paths)), lengths)
+        return np.bincount(owners, weights=values[ids], minlength=len(paths))
+
+
+    def __add_attributes(self, columns, rows=None):
+        """
+        Appends values to the attributes for the last rows edges added, nan for the
+        attributes not in columns. Attributes new to the graph are nan for older edges
+        """
+        nan   = float("nan")
+        count = len(self.__edges)
+        for name in columns:
+            if name not in self.__attributes:
+                self.__attributes[name] = array("d", [nan]) * (count - (len(rows) if rows is not None else 1))
+
+        for name, column in self.__attributes.items():
+            values = columns.get(name)
+            if rows is None:
+                column.append(nan if values is None else values)
+            elif values is None:
+                column.extend(array("d", [nan]) * len(rows))
+            else:
+                column.extend(nan if values[i] is None else values[i] for i in rows)
 
 
     def add_vertex(self, label):
@@ -162,22 +569,27 @@ class graph:
                 Label of the vertex to be added
 
         Returns:
-            A vertex if it is not already in a graph, otherwise None
+            v: vertex
+                The new vertex, or the vertex already in the graph with this label
         """
 
         if not isinstance(label, str):
             raise AssertionError("Label must be str")
 
-        v = None
+        v = self.__labels.get(label)
 
-        if label not in list(vert.get_label() for vert in self.__vertices.keys()):
+        if v is None:
             v = vertex(label)
             self.__vertices[v] = []
+            self.__predecessors[v] = []
+            self.__labels[label] = v
+            self.__degrees[0] += 1
+            self.__frozen = None
 
-        return self.get_vertex(label) if v is None else v
+        return v
 
     
-    def add_edge(self, v1, v2, weight=0, label=None):
+    def add_edge(self, v1, v2, weight=0, label=None, attributes=None):
         """
         Adds an edge between 2 vertexes
 
@@ -187,24 +599,403 @@ class graph:
             
             weight: int or float, default: 0
                 Weight of the edge
-        """
-        if (v1 not in self.__vertices.keys() and v1 not in [v.get_label() for v in self.__vertices.keys()]) or \
-           (v2 not in self.__vertices.keys() and v2 not in [v.get_label() for v in self.__vertices.keys()]):
-            raise AssertionError("Cannot connect an edge between 2 vertices that are not in the graph")
 
+            attributes: dict of str to int or float, default: None
+                Values of the edge attributes, nan for the ones not given
+        """
         if isinstance(v1, str):
-            v1 = self.get_vertex(v1)
-        
+            v1 = self.__labels.get(v1)
+
         if isinstance(v2, str):
-            v2 = self.get_vertex(v2)
+            v2 = self.__labels.get(v2)
 
-        if self.__edges.count(edge((v1, v2), weight, label)) == 0:
-            self.__vertices[v1].append(v2)
-            self.__edges.append(edge((v1, v2), weight, label))
-            return self.__edges[-1]
+        if v1 not in self.__vertices or v2 not in self.__vertices:
+            raise AssertionError("Cannot connect an edge between 2 vertices that are not in the graph")
+
+        if not isinstance(weight, (int, float)):
+            raise AssertionError("weight must be either int or float")
+
+        key = edge.key(v1, v2, weight)
+
+        if self.__multigraph or key not in self.__edge_index:
+            e = edge((v1, v2), weight, label)
+            self.__connect(v1, v2)
+            self.__edges.append(e)
+            self.__frozen = None
+            self.__edge_index.setdefault(key, e)
+            self.__arcs.setdefault((v1, v2), e)
+            self.__add_attributes(attributes or {})
+            return e
         
         return None
 
+
+    @classmethod
+    def from_edge_arrays(cls, sources, targets, weights=None, labels=None, attributes=None, multigraph=False):
+        """
+        Builds a graph from parallel sequences describing its edges
+
+        Args:
+            sources, targets: sequence of str
+                Labels of the endpoints of every edge. Other values such as int ids are
+                converted to str
+
+            weights: sequence of int or float, default: None
+                Weights of the edges, 0 for every edge if not given
+
+            labels: sequence of str, default: None
+                Labels of the edges, by default edge_x
+
+            attributes: dict of str to sequence of int or float, default: None
+                Values of every edge attribute for the edges
+
+            multigraph: bool, default: False
+                Whether rows equal to an earlier edge are kept as parallel edges
+
+        Returns:
+            graph: graph
+                Graph with every vertex mentioned and every distinct edge
+        """
+        gr = cls(multigraph)
+        gr.__extend(sources, targets, weights, labels, attributes)
+        return gr
+
+
+    @classmethod
+    def from_csv(cls, path, source, target, weight=None, label=None, chunksize=None, aggregate=None, attributes=None, multigraph=False):
+        """
+        Builds a graph from a csv file with one edge per row
+
+        Args:
+            path: str
+                Path to the csv file
+
+            source, target: str
+                Names of the columns holding the endpoints of an edge. Rows missing an endpoint are skipped
+
+            weight: str, default: None
+                Name of the column holding the weight of an edge, 0 for every edge if not given
+
+            label: str or callable, default: None
+                Name of the column holding the label of an edge, or a function mapping
+                the labels of the endpoints to the label of the edge. By default edge_x
+
+            chunksize: int, default: None
+                Number of rows read at once. The whole file is read at once if not given
+
+            aggregate: str, default: None
+                How rows between the same endpoints are merged into one edge, see from_rows
+
+            attributes: dict of str to str or (str, str), default: None
+                Edge attributes to read, see from_rows
+
+            multigraph: bool, default: False
+                Whether rows equal to an earlier edge are kept as parallel edges
+
+        Returns:
+            graph: graph
+                Graph with every vertex mentioned and every distinct edge
+        """
+        import pandas as pd
+
+        specs   = graph.__specs(attributes, aggregate)
+        columns = list(dict.fromkeys(c for c in (source, target, weight, label, *(c for c, _ in specs.values()))
+                                     if isinstance(c, str)))
+        chunks  = pd.read_csv(path, usecols=columns, dtype={source: str, target: str}, chunksize=chunksize)
+        if chunksize is None:
+            chunks = [chunks]
+
+        def batches():
+            for chunk in chunks:
+                chunk   = chunk.dropna(subset=[source, target])
+                sources = chunk[source].astype(str).tolist()
+                targets = chunk[target].astype(str).tolist()
+                weights = chunk[weight].tolist() if weight is not None else None
+
+                labels = None
+                if isinstance(label, str):
+                    labels = chunk[label].astype(str).tolist()
+                elif label is not None:
+                    labels = [label(s, t) for s, t in zip(sources, targets)]
+
+                values = [chunk[c].tolist() if c is not None else [None] * len(chunk) for c, _ in specs.values()]
+
+                yield sources, targets, weights, labels, values
+
+        gr = cls(multigraph)
+        gr.__ingest(batches(), aggregate, specs)
+        return gr
+
+
+    @classmethod
+    def from_rows(cls, rows, source, target, weight=None, label=None, aggregate=None, attributes=None, batch=65536, multigraph=False):
+        """
+        Builds a graph from an iterable of rows with one edge per row, such as a csv.reader,
+        a csv.DictReader or a generator. Rows are consumed in batches, so the whole table
+        is never held in memory
+
+        Args:
+            rows: iterable of mapping or sequence
+                Rows holding the endpoints of an edge, indexed by column name or position
+
+            source, target: str or int
+                Columns holding the endpoints of an edge. Rows missing an endpoint, None or
+                empty text, are skipped
+
+            weight: str or int, default: None
+                Column holding the weight of an edge, 0 for every edge if not given.
+                Weights read as text are parsed as int or float
+
+            label: str, int or callable, default: None
+                Column holding the label of an edge, or a function mapping the labels of
+                the endpoints to the label of the edge. By default edge_x
+
+            aggregate: str, default: None
+                How rows between the same endpoints are merged into one edge: "first", "min",
+                "max", "sum" or "mean" of their weights, or "count" of the rows. Memory then
+                grows with the number of distinct endpoint pairs instead of rows. Every
+                distinct edge is kept if not given. Missing values are skipped
+
+            attributes: dict of str to str, int or (str or int, str), default: None
+                Edge attributes to read, by name. Every attribute is a column, or a column with
+                its own aggregation among the above. The aggregation of the weight is used if
+                not given. Attributes are kept as numbers, see get_attribute
+
+            batch: int, default: 65536
+                Number of rows buffered before they are added to the graph
+
+            multigraph: bool, default: False
+                Whether rows equal to an earlier edge are kept as parallel edges
+
+        Returns:
+            graph: graph
+                Graph with every vertex mentioned and every distinct or merged edge
+        """
+        specs = graph.__specs(attributes, aggregate)
+
+        def batches():
+            rest = iter(rows)
+            while True:
+                chunk = list(islice(rest, batch))
+                if not chunk:
+                    return
+
+                chunk   = [row for row in chunk if row[source] not in (None, "") and row[target] not in (None, "")]
+                sources = [str(row[source]) for row in chunk]
+                targets = [str(row[target]) for row in chunk]
+                weights = [_number(row[weight]) for row in chunk] if weight is not None else None
+
+                labels = None
+                if callable(label):
+                    labels = [label(s, t) for s, t in zip(sources, targets)]
+                elif label is not None:
+                    labels = [str(row[label]) for row in chunk]
+
+                values = [[_number(row[c]) for row in chunk] if c is not None else [None] * len(chunk)
+                          for c, _ in specs.values()]
+
+                yield sources, targets, weights, labels, values
+
+        gr = cls(multigraph)
+        gr.__ingest(batches(), aggregate, specs)
+        return gr
+
+
+    @staticmethod
+    def __specs(attributes, aggregate):
+        """
+        Returns every attribute to read as its column and aggregation
+        """
+        aggregations = ("first", "min", "max", "sum", "mean", "count")
+        if aggregate is not None and aggregate not in aggregations:
+            raise AssertionError("aggregate must be one of \"first\", \"min\", \"max\", \"sum\", \"mean\" or \"count\"")
+
+        specs = dict()
+        for name, spec in (attributes or {}).items():
+            column, how = spec if isinstance(spec, tuple) else (spec, aggregate or "first")
+            if how not in aggregations:
+                raise AssertionError("Aggregation of an attribute must be one of \"first\", \"min\", \"max\", \"sum\", \"mean\" or \"count\"")
+            specs[name] = (column, how)
+        return specs
+
+
+    def __ingest(self, batches, aggregate=None, specs=None):
+        """
+        Adds batches of edges as given to __extend, merging the rows between the same endpoints
+        as they stream in when aggregate is given, see from_rows
+        """
+        names = list(specs or ())
+        if aggregate is None:
+            for sources, targets, weights, labels, values in batches:
+                self.__extend(sources, targets, weights, labels, dict(zip(names, values)))
+            return
+
+        hows   = [aggregate] + [how for _, how in specs.values()]
+        merged = dict()
+        for sources, targets, weights, labels, values in batches:
+            if weights is None:
+                weights = [0] * len(sources)
+            if labels is None:
+                labels = [None] * len(sources)
+
+            for s, t, label, *row in zip(sources, targets, labels, weights, *values):
+                key = (s, t)
+
+                acc = merged.get(key)
+                if acc is None:
+                    acc = merged[key] = [label, [None] * len(hows), [0] * len(hows)]
+
+                for i, (how, value) in enumerate(zip(hows, row)):
+                    if how != "count" and value != value:
+                        continue
+
+                    acc[2][i] += 1
+                    if acc[2][i] == 1:
+                        acc[1][i] = value
+                    elif how == "min":
+                        acc[1][i] = min(acc[1][i], value)
+                    elif how == "max":
+                        acc[1][i] = max(acc[1][i], value)
+                    elif how in ("sum", "mean"):
+                        acc[1][i] += value
+
+        nan = float("nan")
+        columns = []
+        for i, how in enumerate(hows):
+            if how == "count":
+                columns.append([counts[i] for _, _, counts in merged.values()])
+            elif how == "mean":
+                columns.append([total[i] / counts[i] if counts[i] else nan for _, total, counts in merged.values()])
+            else:
+                columns.append([value[i] if counts[i] else nan for _, value, counts in merged.values()])
+
+        self.__extend([s for s, _ in merged], [t for _, t in merged], columns[0],
+                      [label for label, _, _ in merged.values()], dict(zip(names, columns[1:])))
+
+
+    def __extend(self, sources, targets, weights=None, labels=None, attributes=None):
+        """
+        Adds a batch of edges given by the labels of their endpoints, creating missing vertices.
+        Attributes map names to a value for every edge of the batch. Arrays such as numpy arrays
+        are converted to lists first, so their items become plain int, float and str, and
+        endpoints that are not str are converted to their str form as vertex labels
+        """
+        self.__frozen = None
+
+        sources, targets, weights, labels = (x.tolist() if hasattr(x, "tolist") else x
+                                             for x in (sources, targets, weights, labels))
+        sources, targets = ([s if isinstance(s, str) else str(s) for s in x] for x in (sources, targets))
+
+        vertices   = self.__vertices
+        index      = self.__labels
+        edges      = self.__edges
+        edge_index = self.__edge_index
+
+        if weights is None:
+            weights = [0] * len(sources)
+
+        if labels is None:
+            labels = [None] * len(sources)
+
+        for label in dict.fromkeys(label for pair in zip(sources, targets) for label in pair):
+            if label not in index:
+                v = vertex(label)
+                vertices[v] = []
+                self.__predecessors[v] = []
+                index[label] = v
+                self.__degrees[0] += 1
+
+        added = []
+        for i, (s, t, weight, label) in enumerate(zip(sources, targets, weights, labels)):
+            v1  = index[s]
+            v2  = index[t]
+            key = edge.key(v1, v2, weight)
+
+            if self.__multigraph or key not in edge_index:
+                e = edge((v1, v2), weight, label)
+                self.__connect(v1, v2)
+                edges.append(e)
+                edge_index.setdefault(key, e)
+                self.__arcs.setdefault((v1, v2), e)
+                added.append(i)
+
+        self.__add_attributes(attributes or {}, added)
+
+
+    def __connect(self, v1, v2):
+        """
+        Adds v2 to the adjacency list of v1 and v1 to the predecessors of v2,
+        keeping the loop, multiplicity and degree counters up to date
+        """
+        degrees   = self.__degrees
+        adjacency = self.__vertices[v1]
+        degrees[len(adjacency)] -= 1
+        adjacency.append(v2)
+        degrees[len(adjacency)] = degrees.get(len(adjacency), 0) + 1
+        self.__predecessors[v2].append(v1)
+
+        if v1 is v2:
+            self.__loops += 1
+
+        count = self.__pairs.get((v1, v2), 0) + 1
+        self.__pairs[(v1, v2)] = count
+        if count == 2:
+            self.__parallel += 1
+
+
+    def freeze(self, weight=None):
+        """
+        Returns the graph in compressed sparse row form. The result is cached
+        until the graph is modified, so it must be treated as read-only
+
+        Args:
+            weight: str, default: None
+                Name of an edge attribute used as the weight of the arcs instead of the edge weight
+
+        Return:
+            csr: csr_graph
+                Array-backed copy of the graph with integer vertex ids
+        """
+        if weight is not None and weight != "weight":
+            csr = self.freeze()
+            key = ("frozen", weight)
+            if key not in csr.cache:
+                column  = self.get_attribute(weight)
+                weights = array("d", (column[i] for i in csr.edge_ids))
+                csr.cache[key] = csr_graph(csr.labels, csr.indptr, csr.indices, weights, csr.edge_ids, csr.directed)
+            return csr.cache[key]
+
+        if self.__frozen is not None:
+            return self.__frozen
+
+        ids    = {v: i for i, v in enumerate(self.__vertices)}
+        labels = [v.get_label() for v in self.__vertices]
+        indptr = array("q", bytes(8 * (len(labels) + 1)))
+
+        ends = []
+        for e in self.__edges:
+            v1, v2 = e.get_endpoints()
+            u, v = ids[v1], ids[v2]
+            ends.append((u, v))
+            indptr[u + 1] += 1
+
+        for i in range(len(labels)):
+            indptr[i + 1] += indptr[i]
+
+        arcs     = indptr[-1]
+        indices  = array("q", bytes(8 * arcs))
+        weights  = array("d", bytes(8 * arcs))
+        edge_ids = array("q", bytes(8 * arcs))
+        fill     = indptr[:-1]
+
+        for i, (u, v) in enumerate(ends):
+            weight = self.__edges[i].get_weight()
+            indices[fill[u]], weights[fill[u]], edge_ids[fill[u]] = v, weight, i
+            fill[u] += 1
+
+        self.__frozen = csr_graph(labels, indptr, indices, weights, edge_ids, directed=True)
+        return self.__frozen
+
     
     def degree(self, v):
         """
@@ -219,11 +1010,52 @@ class graph:
                 Degree of the vertex if it is in the graph, otherwise -1
         """
 
-        if v not in self.__vertices[v]:
+        if v not in self.__vertices:
             return -1
         
         return len(self.__vertices[v])
 
+
+    def in_degree(self, v):
+        """
+        In-degree of the vertex, the number of edges ending at it
+
+        Args:
+            v: vertex
+                Vertex to return the in-degree of
+
+        Return:
+            in_degree: int
+                In-degree of the vertex if it is in the graph, otherwise -1
+        """
+
+        if v not in self.__vertices:
+            return -1
+
+        return len(self.__predecessors[v])
+
+
+    def out_degree(self, v):
+        """
+        Out-degree of the vertex, the number of edges starting at it, see degree
+        """
+        return self.degree(v)
+
+
+    def edge_count(self):
+        return len(self.__edges)
+
+
+    def degree_histogram(self):
+        """
+        Returns the number of vertices of every degree
+
+        Return:
+            histogram: dict of int to int
+                Number of vertices of every degree some vertex has
+        """
+        return {d: count for d, count in sorted(self.__degrees.items()) if count}
+
     
     def is_empty(self):
         """
@@ -233,17 +1065,7 @@ class graph:
             empty: bool
                 Whether a graph is empty or not
         """
-        res = 0
-        for v in self.__vertices.keys():
-            res += len(self.__vertices[v])
-        
-        for v1 in self.__vertices.keys():
-            for v2 in self.__vertices[v1]:
-                if v1 == v2:
-                    res += 1
-                    break
-
-        return res == 0
+        return not self.__edges
 
     
     def is_singleton(self):
@@ -254,7 +1076,7 @@ class graph:
             empty: bool
                 Whether a graph is singleton or not
         """
-        return len(self.__vertices.keys()) == 1 and self.is_empty()
+        return len(self.__vertices) == 1 and self.is_empty()
 
     
     def is_null(self):
@@ -265,7 +1087,7 @@ class graph:
             empty: bool
                 Whether a graph is null or not
         """
-        return len(self.__vertices.keys()) == 0
+        return len(self.__vertices) == 0
 
     
     def is_trivial(self):
@@ -287,12 +1109,7 @@ class graph:
             empty: bool
                 Whether a graph has a loop or not
         """
-        for v1 in self.__vertices.keys():
-            for v2 in self.__vertices[v1]:
-                if v1 == v2:
-                    return True
-        
-        return False
+        return self.__loops > 0
 
 
     def has_parallel(self, v1=None, v2=None):
@@ -308,19 +1125,12 @@ class graph:
                 Whether a graph or two vertices have parallel edges or not
         """
         if not v1 is None and not v2 is None:
-            if v1 not in self.__vertices.keys() or v2 not in self.__vertices.keys():
+            if v1 not in self.__vertices or v2 not in self.__vertices:
                 raise AssertionError("Edges must be in the graph") 
-            
-            if self.__vertices[v1].count(v2) > 1:
-                return True
-            
-            return False
-        else:
-            for v1 in self.__vertices.keys():
-                for v2 in self.__vertices[v1]:
-                    if self.has_parallel(v1, v2):
-                        return True
-            return False
+
+            return self.__pairs.get((v1, v2), 0) > 1
+
+        return self.__parallel > 0
 
     
     def is_simple(self):
@@ -345,14 +1155,9 @@ class graph:
         if not self.is_simple():
             return False
 
-        lenv = len(self.__vertices.keys())
+        lenv = len(self.__vertices)
 
-        for v in self.__vertices.keys():
-            deg = len(self.__vertices[v])
-            if deg != lenv - 1:
-                return False
-            
-        return True
+        return self.__degrees.get(lenv - 1, 0) == lenv
 
     
     def are_adjacent_vertices(self, v1, v2):
@@ -388,6 +1193,21 @@ class graph:
         return self.__vertices[v] if v in self.__vertices.keys() else []
 
 
+    def predecessors(self, v):
+        """
+        Returns a list of the vertices with an edge to v, once per edge
+
+        Args:
+            v: vertex
+                Vertex to return predecessors of
+
+        Return:
+            predecessors: list of vertex
+                Tails of the edges ending at v, empty if v is not in the graph
+        """
+        return self.__predecessors[v] if v in self.__predecessors else []
+
+
     def isolated_vertices(self):
         """
         Returns a list of isolated vertices
@@ -396,7 +1216,7 @@ class graph:
             empty: bool
                 Whether a graph is complete or not
         """
-        return [v for v in self.__vertices.keys() if len(self.__vertices[v]) == 0]
+        return [v for v in self.__vertices.keys() if len(self.__vertices[v]) == 0 and len(self.__predecessors[v]) == 0]
 
     
     def __str__(self):
@@ -0,0 +1,569 @@
+from array import array
+from collections import deque
+
+from graph import graph, csr_graph
+
+
+class flow_network:
+    def __init__(self, gr):
+        """
+        Residual network of a graph, edge weights are capacities. Every arc a of the frozen graph
+        becomes the residual arc 2a with its capacity and the reverse arc 2a + 1 = 2a ^ 1 with none,
+        all stored in flat arrays
+
+        Args:
+            gr: graph or csr_graph
+                Graph we are working with, all weights must be non-negative
+        """
+        if not isinstance(gr, (graph, csr_graph)):
+            raise AssertionError("gr must be graph or csr_graph")
+
+        csr   = gr.freeze()
+        n, m  = csr.vertex_count(), csr.arc_count()
+        tails = csr.tails()
+
+        self.labels   = csr.labels
+        self.index    = csr.index
+        self.head     = array("q", bytes(16 * m))
+        self.capacity = array("d", bytes(16 * m))
+
+        for a in range(m):
+            self.head[2 * a], self.head[2 * a + 1] = csr.indices[a], tails[a]
+            self.capacity[2 * a] = csr.weights[a]
+
+        self.adj_ptr = array("q", bytes(8 * (n + 1)))
+        for a in range(2 * m):
+            self.adj_ptr[self.head[a ^ 1] + 1] += 1
+        for u in range(n):
+            self.adj_ptr[u + 1] += self.adj_ptr[u]
+
+        self.adj = array("q", bytes(16 * m))
+        fill = self.adj_ptr[:-1]
+        for a in range(2 * m):
+            u = self.head[a ^ 1]
+            self.adj[fill[u]] = a
+            fill[u] += 1
+
+        self.residual = array("d", self.capacity)
+        self.source   = None
+        self.sink     = None
+        self.value    = 0.0
+        self.__arcs   = None
+        self.directed = csr.directed
+        self.edge_ids = csr.edge_ids
+
+
+    def vertex_count(self):
+        return len(self.labels)
+
+
+    def __vertex_id(self, v, name):
+        if not isinstance(v, str):
+            v = v.get_label()
+        u = self.index.get(v)
+        if u is None:
+            raise AssertionError(f"{name} must be a vertex of the graph")
+        return u
+
+
+    def __reset(self, source, sink):
+        s = self.__vertex_id(source, "source")
+        t = self.__vertex_id(sink, "sink")
+        if s == t:
+            raise AssertionError("source and sink must be different vertices")
+
+        self.residual[:] = self.capacity
+        self.source, self.sink, self.value = s, t, 0.0
+        return s, t
+
+
+    def __levels(self, s, t):
+        """
+        Breadth-first search over arcs with residual capacity. Returns the distance of every vertex from s, -1 if unreachable
+        """
+        head, residual, adj, adj_ptr = self.head, self.residual, self.adj, self.adj_ptr
+
+        level = array("q", [-1]) * self.vertex_count()
+        level[s] = 0
+        queue = deque([s])
+        while queue:
+            u = queue.popleft()
+            for i in range(adj_ptr[u], adj_ptr[u + 1]):
+                a = adj[i]
+                v = head[a]
+                if level[v] < 0 and residual[a] > 0:
+                    level[v] = level[u] + 1
+                    if v == t:
+                        return level
+                    queue.append(v)
+        return level
+
+
+    def edmonds_karp(self, source, sink):
+        """
+        Edmonds-Karp algorithm, augments along shortest residual paths found by breadth-first search
+
+        Args:
+            source, sink: vertex or str
+                Source and sink vertices
+
+        Returns:
+            value: float
+                Value of the maximum flow
+        """
+        s, t = self.__reset(source, sink)
+        head, residual, adj, adj_ptr = self.head, self.residual, self.adj, self.adj_ptr
+
+        while True:
+            parent = array("q", [-1]) * self.vertex_count()
+            parent[s] = -2
+            queue = deque([s])
+            while queue and parent[t] == -1:
+                u = queue.popleft()
+                for i in range(adj_ptr[u], adj_ptr[u + 1]):
+                    a = adj[i]
+                    v = head[a]
+                    if parent[v] == -1 and residual[a] > 0:
+                        parent[v] = a
+                        queue.append(v)
+
+            if parent[t] == -1:
+                return self.value
+
+            bottleneck = float("inf")
+            v = t
+            while v != s:
+                a = parent[v]
+                bottleneck = min(bottleneck, residual[a])
+                v = head[a ^ 1]
+
+            v = t
+            while v != s:
+                a = parent[v]
+                residual[a]     -= bottleneck
+                residual[a ^ 1] += bottleneck
+                v = head[a ^ 1]
+
+            self.value += bottleneck
+
+
+    def dinic(self, source, sink):
+        """
+        Dinic's algorithm, saturates a blocking flow of the level graph in every phase
+
+        Args:
+            source, sink: vertex or str
+                Source and sink vertices
+
+        Returns:
+            value: float
+                Value of the maximum flow
+        """
+        s, t = self.__reset(source, sink)
+        return self.__blocking_flows(s, t)
+
+
+    def __blocking_flows(self, s, t):
+        """
+        Dinic's phases from the current residual state until t is unreachable from s
+        """
+        head, residual, adj, adj_ptr = self.head, self.residual, self.adj, self.adj_ptr
+
+        while True:
+            level = self.__levels(s, t)
+            if level[t] < 0:
+                return self.value
+
+            it   = adj_ptr[:-1]
+            path = []
+            u    = s
+            while True:
+                if u == t:
+                    bottleneck = min(residual[a] for a in path)
+                    for a in path:
+                        residual[a]     -= bottleneck
+                        residual[a ^ 1] += bottleneck
+                    self.value += bottleneck
+                    path, u = [], s
+                    continue
+
+                while it[u] < adj_ptr[u + 1]:
+                    a = adj[it[u]]
+                    if residual[a] > 0 and level[head[a]] == level[u] + 1:
+                        break
+                    it[u] += 1
+                else:
+                    if u == s:
+                        break
+                    level[u] = -1
+                    a = path.pop()
+                    u = head[a ^ 1]
+                    it[u] += 1
+                    continue
+
+                path.append(a)
+                u = head[a]
+
+
+    def push_relabel(self, source, sink):
+        """
+        Highest-label push-relabel algorithm with the gap heuristic and periodic global
+        relabeling by breadth-first search from the sink. Excess that cannot reach the sink
+        is returned to the source, so the result is a flow like the augmenting-path methods
+
+        Args:
+            source, sink: vertex or str
+                Source and sink vertices
+
+        Returns:
+            value: float
+                Value of the maximum flow
+        """
+        s, t = self.__reset(source, sink)
+        head, residual, adj, adj_ptr = self.head, self.residual, self.adj, self.adj_ptr
+
+        n      = self.vertex_count()
+        excess = array("d", bytes(8 * n))
+        height = array("q", bytes(8 * n))
+        count  = array("q", bytes(8 * 2 * n))
+        cur    = adj_ptr[:-1]
+
+        for i in range(adj_ptr[s], adj_ptr[s + 1]):
+            a = adj[i]
+            f = residual[a]
+            if f > 0:
+                residual[a]     -= f
+                residual[a ^ 1] += f
+                excess[head[a]] += f
+                excess[s]       -= f
+
+        def global_relabel():
+            for u in range(n):
+                height[u] = 2 * n - 1
+            for root, base in ((t, 0), (s, n)):
+                height[root] = base
+                queue = deque([root])
+                while queue:
+                    v = queue.popleft()
+                    for i in range(adj_ptr[v], adj_ptr[v + 1]):
+                        a = adj[i]
+                        u = head[a]
+                        if height[u] == 2 * n - 1 and u != s and residual[a ^ 1] > 0:
+                            height[u] = height[v] + 1
+                            queue.append(u)
+
+            for h in range(2 * n):
+                count[h] = 0
+            buckets = [[] for _ in range(2 * n)]
+            for u in range(n):
+                count[height[u]] += 1
+                cur[u] = adj_ptr[u]
+                if excess[u] > 0 and u != s and u != t:
+                    buckets[height[u]].append(u)
+            return buckets
+
+        buckets  = global_relabel()
+        highest  = 2 * n - 1
+        relabels = 0
+
+        while highest >= 0:
+            if not buckets[highest]:
+                highest -= 1
+                continue
+
+            u = buckets[highest].pop()
+            if height[u] != highest or excess[u] <= 0:
+                continue
+
+            while excess[u] > 0:
+                if cur[u] == adj_ptr[u + 1]:
+                    old = height[u]
+                    new = 2 * n - 1
+                    for i in range(adj_ptr[u], adj_ptr[u + 1]):
+                        a = adj[i]
+                        if residual[a] > 0 and height[head[a]] + 1 < new:
+                            new = height[head[a]] + 1
+
+                    count[old] -= 1
+                    height[u]   = new
+                    count[new] += 1
+                    cur[u]      = adj_ptr[u]
+                    relabels   += 1
+
+                    if old < n and count[old] == 0:
+                        for v in range(n):
+                            if old < height[v] < n:
+                                count[height[v]] -= 1
+                                height[v] = n + 1
+                                count[n + 1] += 1
+                                cur[v] = adj_ptr[v]
+                                if excess[v] > 0 and v != u:
+                                    buckets[n + 1].append(v)
+                                    highest = max(highest, n + 1)
+                        break
+                    continue
+
+                a = adj[cur[u]]
+                v = head[a]
+                if residual[a] > 0 and height[u] == height[v] + 1:
+                    f = min(excess[u], residual[a])
+                    residual[a]     -= f
+                    residual[a ^ 1] += f
+                    excess[u]       -= f
+                    if excess[v] <= 0 and v != s and v != t:
+                        buckets[height[v]].append(v)
+                        highest = max(highest, height[v])
+                    excess[v] += f
+                else:
+                    cur[u] += 1
+
+            if excess[u] > 0:
+                buckets[height[u]].append(u)
+                highest = max(highest, height[u])
+
+            if relabels >= n:
+                buckets  = global_relabel()
+                highest  = 2 * n - 1
+                relabels = 0
+
+        self.value = excess[t]
+        return self.value
+
+
+    def __inflow(self, t):
+        """
+        Net flow into vertex t
+        """
+        inflow = 0.0
+        for i in range(self.adj_ptr[t], self.adj_ptr[t + 1]):
+            a = self.adj[i]
+            if a & 1:
+                inflow += self.residual[a]
+            else:
+                inflow -= self.capacity[a] - self.residual[a]
+        return inflow
+
+
+    def __push(self, s, t, limit):
+        """
+        Moves up to limit units from s to t along shortest residual paths. Returns the amount moved
+        """
+        head, residual, adj, adj_ptr = self.head, self.residual, self.adj, self.adj_ptr
+
+        moved = 0.0
+        while moved < limit:
+            parent = array("q", [-1]) * self.vertex_count()
+            parent[s] = -2
+            queue = deque([s])
+            while queue and parent[t] == -1:
+                u = queue.popleft()
+                for i in range(adj_ptr[u], adj_ptr[u + 1]):
+                    a = adj[i]
+                    v = head[a]
+                    if parent[v] == -1 and residual[a] > 0:
+                        parent[v] = a
+                        queue.append(v)
+
+            if parent[t] == -1:
+                break
+
+            bottleneck = limit - moved
+            v = t
+            while v != s:
+                a = parent[v]
+                bottleneck = min(bottleneck, residual[a])
+                v = head[a ^ 1]
+
+            v = t
+            while v != s:
+                a = parent[v]
+                residual[a]     -= bottleneck
+                residual[a ^ 1] += bottleneck
+                v = head[a ^ 1]
+
+            moved += bottleneck
+
+        return moved
+
+
+    def set_capacity(self, v1, v2, capacity):
+        """
+        Changes the capacity of the arc from v1 to v2 and restores a maximum flow starting
+        from the current one, see set_capacities
+
+        Args:
+            v1, v2: vertex or str
+                Endpoints of the arc
+
+            capacity: int or float
+                New capacity of the arc
+
+        Returns:
+            value: float
+                Value of the maximum flow after the change
+        """
+        return self.set_capacities({(v1, v2): capacity})
+
+
+    def set_capacities(self, capacities):
+        """
+        Changes the capacities of some arcs and restores a maximum flow starting from the
+        current one instead of solving from zero flow. Flow above a lowered capacity is first
+        rerouted around the arc, and what cannot be rerouted is cancelled back to the source
+        and from the sink. Augmenting paths are then added for the raised capacities.
+        For parallel arcs the first one is changed. On an undirected graph both arcs of the
+        edge are changed, so v1 and v2 can be given in either order
+
+        Args:
+            capacities: dict of (vertex or str, vertex or str) to int or float
+                New capacity of the arc between every pair of endpoints
+
+        Returns:
+            value: float
+                Value of the maximum flow after the changes
+        """
+        if self.source is None:
+            raise AssertionError("a maximum flow must be computed first")
+
+        for (v1, v2), cap in capacities.items():
+            arcs = self.__edge_arcs(self.__vertex_id(v1, "v1"), self.__vertex_id(v2, "v2"))
+            if arcs is None:
+                raise AssertionError("there must be an arc between v1 and v2")
+            if cap < 0:
+                raise AssertionError("capacity must be non-negative")
+
+            for a in arcs:
+                self.__set_arc_capacity(a, cap)
+
+        self.value = self.__inflow(self.sink)
+        return self.__blocking_flows(self.source, self.sink)
+
+
+    def __edge_arcs(self, u, v):
+        """
+        Residual arcs to change for the pair u, v: the first arc from u to v, and on an undirected
+        graph the arc of the same edge from v to u. None if there is no arc from u to v
+        """
+        if self.__arcs is None:
+            first = dict()
+            for a in range(len(self.head) - 2, -1, -2):
+                first[(self.head[a + 1], self.head[a])] = a
+
+            self.__arcs = {pair: [a] for pair, a in first.items()}
+            if not self.directed:
+                for (x, y), a in first.items():
+                    if x == y:
+                        continue
+                    if self.edge_ids is None:
+                        self.__arcs[(x, y)].append(first[(y, x)])
+                        continue
+                    for i in range(self.adj_ptr[y], self.adj_ptr[y + 1]):
+                        b = self.adj[i]
+                        if not b & 1 and self.head[b] == x and self.edge_ids[b // 2] == self.edge_ids[a // 2]:
+                            self.__arcs[(x, y)].append(b)
+                            break
+
+        return self.__arcs.get((u, v))
+
+
+    def __set_arc_capacity(self, a, cap):
+        """
+        Sets the capacity of residual arc a, rerouting or cancelling the flow above it, see set_capacities
+        """
+        s, t = self.source, self.sink
+        residual, capacity, head = self.residual, self.capacity, self.head
+
+        f = capacity[a] - residual[a]
+        capacity[a] = cap
+        if cap >= f:
+            residual[a] = cap - f
+            return
+
+        u, v   = head[a + 1], head[a]
+        excess = f - cap
+        residual[a]     = 0.0
+        residual[a + 1] = cap
+
+        excess -= self.__push(u, v, excess)
+        if excess > 0 and u != s and u != t:
+            rest = excess - self.__push(u, s, excess)
+            if rest > 0:
+                self.__push(u, t, rest)
+        if excess > 0 and v != s and v != t:
+            rest = excess - self.__push(t, v, excess)
+            if rest > 0:
+                self.__push(s, v, rest)
+
+
+    def min_cut(self):
+        """
+        Minimum cut of the last maximum flow computed
+
+        Returns:
+            source_side: list of str
+                Labels of the vertices still reachable from the source in the residual network
+
+            cut: list of (str, str, float)
+                Endpoints and capacity of every arc leaving the source side, they sum to the flow value
+        """
+        if self.source is None:
+            raise AssertionError("a maximum flow must be computed first")
+
+        level = self.__levels(self.source, None)
+        cut   = []
+        for a in range(0, len(self.head), 2):
+            u, v = self.head[a + 1], self.head[a]
+            if level[u] >= 0 and level[v] < 0 and self.capacity[a] > 0:
+                cut.append((self.labels[u], self.labels[v], self.capacity[a]))
+
+        return [self.labels[u] for u in range(self.vertex_count()) if level[u] >= 0], cut
+
+
+    def flows(self):
+        """
+        Flow on every arc of the frozen graph carrying some
+
+        Returns:
+            flows: dict of (str, str) to float
+                Flow between every pair of vertices, summed over parallel arcs
+        """
+        flows = dict()
+        for a in range(0, len(self.head), 2):
+            f = self.capacity[a] - self.residual[a]
+            if f > 0:
+                key = (self.labels[self.head[a + 1]], self.labels[self.head[a]])
+                flows[key] = flows.get(key, 0.0) + f
+        return flows
+
+
+def max_flow(gr, source, sink, method="dinic"):
+    """
+    Maximum flow between source and sink, edge weights are capacities
+
+    Args:
+        gr: graph or csr_graph
+            Graph we are working with, all weights must be non-negative
+
+        source, sink: vertex or str
+            Source and sink vertices
+
+        method: str, default: "dinic"
+            Either "dinic", "edmonds_karp" or "push_relabel". Push-relabel is usually
+            the fastest on dense networks
+
+    Returns:
+        value: float
+            Value of the maximum flow
+
+        cut: list of (str, str, float)
+            Arcs of a minimum cut with their capacities
+    """
+    methods = {"dinic":        flow_network.dinic,
+               "edmonds_karp": flow_network.edmonds_karp,
+               "push_relabel": flow_network.push_relabel}
+    if method not in methods:
+        raise AssertionError(f"method must be one of {', '.join(methods)}")
+
+    network = flow_network(gr)
+    value   = methods[method](network, source, sink)
+    return value, network.min_cut()[1]
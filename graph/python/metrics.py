@@ -0,0 +1,752 @@
+import random
+from collections import deque
+from heapq import heappush, heappop
+from math import ceil, log, sqrt
+
+from graph import graph, csr_graph
+from shortest_path import get_path_cache, dijkstra_ids, bfs_ids
+from parallel import map_sources
+
+
+def _vertex_id(csr, node):
+    u = csr.get_id(node)
+    if u is None:
+        raise AssertionError("node must be a vertex of the graph")
+    return u
+
+
+def degree_connectivity(gr, node):
+    """
+    Compute connectivity degree of a vertex
+
+    Args:
+        gr: graph or csr_graph
+            -
+        node: vertex or str
+            -
+    Returns:
+        outflow_centrality, inflow_centrality: int
+    """
+
+    if not isinstance(gr, (graph, csr_graph)):
+        raise AssertionError("gr must be graph or csr_graph")
+
+    csr = gr.freeze()
+    u = _vertex_id(csr, node)
+
+    return csr.degree(u), csr.transpose().degree(u)
+
+
+def closeness_centrality(gr, node, weight="weight"):
+    """
+    Compute closeness centrality of a vertex
+
+    Args:
+        gr: graph or csr_graph
+            -
+        node: vertex or str
+            -
+        weight: str, default: "weight"
+            "weight" to measure paths by edge weight, None to count edges
+    Returns:
+        closeness_centrality: float
+    """
+
+    if not isinstance(gr, (graph, csr_graph)):
+        raise AssertionError("gr must be graph or csr_graph")
+
+    cache = get_path_cache(gr, weight)
+    u = _vertex_id(cache.csr, node)
+
+    return sum(cache.tree(u)[0].values()) / (cache.csr.vertex_count() - 1)
+
+
+def distance_sums_ids(csr, sources=None, weighted=True):
+    """
+    Sums and maxima of the shortest path lengths from the given sources on a frozen graph
+
+    Args:
+        csr: csr_graph
+            Graph we are working with, all weights must be non-negative
+
+        sources: iterable of int, default: None
+            Ids of the sources, every vertex if not given
+
+        weighted: bool, default: True
+            Whether paths are measured by edge weight or by number of edges
+
+    Returns:
+        sums: list of (int, float, float)
+            Id of every source with the sum and the maximum of its distances to reachable vertices
+    """
+    if sources is None:
+        sources = range(csr.vertex_count())
+
+    sums = []
+    for s in sources:
+        dist = (dijkstra_ids(csr, s) if weighted else bfs_ids(csr, s))[0]
+        sums.append((s, sum(dist.values()), max(dist.values())))
+
+    return sums
+
+
+def _distance_sums(gr, weight, parallel, workers):
+    """
+    Returns distance_sums_ids over every vertex, from the path cache or from a pool of processes
+    """
+    if parallel:
+        if weight not in ("weight", None):
+            raise AssertionError("weight must be either \"weight\" or None")
+        csr = gr.freeze()
+        return csr, [r for part in map_sources(csr, distance_sums_ids, workers=workers, args=(weight is not None,))
+                       for r in part]
+
+    cache = get_path_cache(gr, weight).fill()
+    return cache.csr, [(s, sum(dist.values()), max(dist.values())) for s, (dist, _) in cache.trees.items()]
+
+
+def closeness(gr, weight="weight", parallel=False, workers=None):
+    """
+    Compute closeness centrality of every vertex
+
+    Args:
+        gr: graph or csr_graph
+            -
+        weight: str, default: "weight"
+            "weight" to measure paths by edge weight, None to count edges
+        parallel: bool, default: False
+            Whether to shard the sources over a pool of processes
+        workers: int, default: None
+            Number of processes, the number of CPUs if not given
+    Returns:
+        closeness: dict of str to float
+    """
+
+    if not isinstance(gr, (graph, csr_graph)):
+        raise AssertionError("gr must be graph or csr_graph")
+
+    csr, sums = _distance_sums(gr, weight, parallel, workers)
+    n = csr.vertex_count()
+
+    return {csr.labels[s]: total / (n - 1) for s, total, _ in sums}
+
+
+def brandes_ids(csr, sources=None, weighted=False):
+    """
+    Brandes' algorithm on a frozen graph. Accumulates the dependencies of every vertex on the
+    shortest paths from the given sources, counting every shortest path between a pair
+
+    Args:
+        csr: csr_graph
+            Graph we are working with, all weights must be non-negative
+
+        sources: iterable of int, default: None
+            Ids of the sources to accumulate, every vertex if not given
+
+        weighted: bool, default: False
+            Whether paths are measured by edge weight or by number of edges
+
+    Returns:
+        betweenness: list of float
+            Sum of the dependencies of every vertex, indexed by vertex id
+    """
+    indptr, indices, weights = csr.indptr, csr.indices, csr.weights
+
+    n = csr.vertex_count()
+    betweenness = [0.0] * n
+    if sources is None:
+        sources = range(n)
+
+    for s in sources:
+        order = []
+        preds = {s: []}
+        sigma = {s: 1}
+        dist  = {s: 0.0}
+
+        if weighted:
+            done = set()
+            heap = [(0.0, s)]
+            while heap:
+                d, u = heappop(heap)
+                if u in done:
+                    continue
+                done.add(u)
+                order.append(u)
+                for a in range(indptr[u], indptr[u + 1]):
+                    v  = indices[a]
+                    nd = d + weights[a]
+                    if v not in dist or nd < dist[v]:
+                        dist[v]  = nd
+                        sigma[v] = sigma[u]
+                        preds[v] = [u]
+                        heappush(heap, (nd, v))
+                    elif nd == dist[v] and v not in done:
+                        sigma[v] += sigma[u]
+                        preds[v].append(u)
+        else:
+            queue = deque([s])
+            while queue:
+                u = queue.popleft()
+                order.append(u)
+                d = dist[u] + 1
+                for a in range(indptr[u], indptr[u + 1]):
+                    v = indices[a]
+                    if v not in dist:
+                        dist[v]  = d
+                        sigma[v] = 0
+                        preds[v] = []
+                        queue.append(v)
+                    if dist[v] == d:
+                        sigma[v] += sigma[u]
+                        preds[v].append(u)
+
+        delta = dict.fromkeys(order, 0.0)
+        for v in reversed(order):
+            coeff = (1 + delta[v]) / sigma[v]
+            for u in preds[v]:
+                delta[u] += sigma[u] * coeff
+            if v != s:
+                betweenness[v] += delta[v]
+
+    return betweenness
+
+
+def betweenness(gr, weight=None, normalized=False, parallel=False, workers=None):
+    """
+    Compute betweenness centrality of every vertex in one pass of Brandes' algorithm.
+    The result is cached on the frozen graph
+
+    Args:
+        gr: graph or csr_graph
+            -
+        weight: str, default: None
+            "weight" to measure paths by edge weight, None to count edges
+        normalized: bool, default: False
+            Whether to divide by the number of ordered pairs of other vertices
+        parallel: bool, default: False
+            Whether to shard the sources over a pool of processes
+        workers: int, default: None
+            Number of processes, the number of CPUs if not given
+    Returns:
+        betweenness: dict of str to float
+    """
+
+    if not isinstance(gr, (graph, csr_graph)):
+        raise AssertionError("gr must be graph or csr_graph")
+
+    if weight not in ("weight", None):
+        raise AssertionError("weight must be either \"weight\" or None")
+
+    csr = gr.freeze()
+    key = ("betweenness", weight)
+    if key not in csr.cache:
+        if parallel:
+            parts = map_sources(csr, brandes_ids, workers=workers, args=(weight is not None,))
+            csr.cache[key] = [sum(values) for values in zip(*parts)]
+        else:
+            csr.cache[key] = brandes_ids(csr, weighted=weight is not None)
+
+    n     = csr.vertex_count()
+    scale = 1 / ((n - 1) * (n - 2)) if normalized and n > 2 else 1
+    return {label: b * scale for label, b in zip(csr.labels, csr.cache[key])}
+
+
+def betweenness_centrality(gr, node, weight=None):
+    """
+    Compute betweenness centrality of a vertex, the sum over pairs of other vertices of the
+    fraction of their shortest paths passing through it. Values for every vertex are computed
+    on the first call, see betweenness
+
+    Args:
+        gr: graph or csr_graph
+            -
+        node: vertex or str
+            -
+        weight: str, default: None
+            "weight" to measure paths by edge weight, None to count edges
+    Returns:
+        betweenness_centrality: float
+    """
+
+    if not isinstance(gr, (graph, csr_graph)):
+        raise AssertionError("gr must be graph or csr_graph")
+
+    csr = gr.freeze()
+    u = _vertex_id(csr, node)
+
+    return betweenness(csr, weight)[csr.labels[u]]
+
+
+def _pivots(csr, samples, epsilon, confidence, seed):
+    """
+    Draws the random pivots of a sampling estimate, with replacement. Without a number of samples,
+    takes enough of them for every vertex to be within epsilon of the range of the sampled
+    quantity at the given confidence, by Hoeffding's inequality and a union bound
+
+    Returns:
+        pivots, width: list of int, float
+            Pivots and the half-width of the confidence intervals of the means over them, in units
+            of the range of the sampled quantity, holding for every vertex at once
+    """
+    n = csr.vertex_count()
+    if not 0 < confidence < 1:
+        raise AssertionError("confidence must be between 0 and 1")
+
+    if samples is None:
+        samples = ceil(log(2 * n / (1 - confidence)) / (2 * epsilon ** 2))
+    if samples < 1:
+        raise AssertionError("samples must be a positive int")
+
+    rng = random.Random(seed)
+    return [rng.randrange(n) for _ in range(samples)], sqrt(log(2 * n / (1 - confidence)) / (2 * samples))
+
+
+def distance_totals_ids(csr, sources, weighted=True):
+    """
+    Sums of the shortest path lengths from the given sources to every vertex of a frozen graph
+
+    Args:
+        csr: csr_graph
+            Graph we are working with, all weights must be non-negative
+
+        sources: iterable of int
+            Ids of the sources, repeated sources count as many times
+
+        weighted: bool, default: True
+            Whether paths are measured by edge weight or by number of edges
+
+    Returns:
+        totals, farthest: list of float, float
+            Sum of the distances to every vertex indexed by vertex id, unreachable sources
+            counting 0, and the longest distance found
+    """
+    totals   = [0.0] * csr.vertex_count()
+    farthest = 0.0
+    for s in sources:
+        dist = (dijkstra_ids(csr, s) if weighted else bfs_ids(csr, s))[0]
+        for v, d in dist.items():
+            totals[v] += d
+        farthest = max(farthest, max(dist.values()))
+
+    return totals, farthest
+
+
+def approximate_closeness(gr, samples=None, weight="weight", epsilon=0.1, confidence=0.95, seed=None,
+                          parallel=False, workers=None):
+    """
+    Estimate closeness centrality of every vertex from the shortest paths of a random sample of
+    pivots. The distance sum of a vertex is estimated from its distances to the pivots, so one
+    single-source search per pivot is run on the reversed graph
+
+    Args:
+        gr: graph or csr_graph
+            -
+        samples: int, default: None
+            Number of pivots, by default enough for epsilon at the given confidence
+        weight: str, default: "weight"
+            "weight" to measure paths by edge weight, None to count edges
+        epsilon: float, default: 0.1
+            Error wanted in units of the diameter, when samples is not given
+        confidence: float, default: 0.95
+            Probability for the bound to hold
+        seed: int, default: None
+            Seed of the sampling
+        parallel: bool, default: False
+            Whether to shard the pivots over a pool of processes
+        workers: int, default: None
+            Number of processes, the number of CPUs if not given
+    Returns:
+        closeness, bound: dict of str to float, float
+            Estimate for every vertex, and the error not exceeded by any of the estimates
+            with the given confidence. On an undirected graph the diameter is bounded by twice
+            the largest eccentricity of a pivot, which holds if every component has a pivot.
+            On a directed graph the bound takes the longest sampled distance as the diameter,
+            which may underestimate it, so the bound is only a heuristic there
+    """
+
+    if not isinstance(gr, (graph, csr_graph)):
+        raise AssertionError("gr must be graph or csr_graph")
+
+    if weight not in ("weight", None):
+        raise AssertionError("weight must be either \"weight\" or None")
+
+    csr   = gr.freeze()
+    n     = csr.vertex_count()
+    pivots, width = _pivots(csr, samples, epsilon, confidence, seed)
+
+    reverse = csr.transpose()
+    if parallel:
+        parts    = map_sources(reverse, distance_totals_ids, pivots, workers, (weight is not None,))
+        totals   = [sum(values) for values in zip(*(totals for totals, _ in parts))]
+        farthest = max(farthest for _, farthest in parts)
+    else:
+        totals, farthest = distance_totals_ids(reverse, pivots, weight is not None)
+
+    diameter = farthest if csr.directed else 2 * farthest
+    scale    = n / (len(pivots) * (n - 1))
+    return {label: total * scale for label, total in zip(csr.labels, totals)}, diameter * width * n / (n - 1)
+
+
+def top_closeness(gr, k, samples=None, weight="weight", epsilon=0.1, confidence=0.95, seed=None,
+                  parallel=False, workers=None):
+    """
+    Find the k vertices of smallest closeness centrality, the most central ones. Closeness is
+    estimated for every vertex as in approximate_closeness, then computed exactly for the
+    vertices whose estimate is close enough to the k-th smallest to belong to the top
+
+    Args:
+        gr: graph or csr_graph
+            -
+        k: int
+            Number of vertices wanted
+        samples, weight, epsilon, confidence, seed, parallel, workers:
+            See approximate_closeness
+    Returns:
+        top: list of (str, float)
+            Labels and exact closeness of the k most central vertices, most central first.
+            Exact with the given confidence on an undirected graph, see approximate_closeness
+            for the bound on a directed one
+    """
+
+    estimates, bound = approximate_closeness(gr, samples, weight, epsilon, confidence, seed, parallel, workers)
+
+    csr = gr.freeze()
+    n   = csr.vertex_count()
+    if not 0 < k <= n:
+        raise AssertionError("k must be between 1 and the number of vertices")
+
+    threshold  = sorted(estimates.values())[k - 1] + 2 * bound
+    candidates = [csr.get_id(label) for label, value in estimates.items() if value <= threshold]
+
+    if parallel:
+        sums = [r for part in map_sources(csr, distance_sums_ids, candidates, workers, (weight is not None,))
+                  for r in part]
+    else:
+        sums = distance_sums_ids(csr, candidates, weight is not None)
+
+    return sorted(((csr.labels[s], total / (n - 1)) for s, total, _ in sums), key=lambda r: r[1])[:k]
+
+
+def approximate_betweenness(gr, samples=None, weight=None, normalized=False, epsilon=0.1, confidence=0.95,
+                            seed=None, parallel=False, workers=None):
+    """
+    Estimate betweenness centrality of every vertex by accumulating Brandes' dependencies from a
+    random sample of sources only
+
+    Args:
+        gr: graph or csr_graph
+            -
+        samples: int, default: None
+            Number of sources, by default enough for epsilon at the given confidence
+        weight: str, default: None
+            "weight" to measure paths by edge weight, None to count edges
+        normalized: bool, default: False
+            Whether to divide by the number of ordered pairs of other vertices
+        epsilon: float, default: 0.1
+            Error wanted in units of the largest possible betweenness, when samples is not given
+        confidence: float, default: 0.95
+            Probability for the bound to hold
+        seed: int, default: None
+            Seed of the sampling
+        parallel: bool, default: False
+            Whether to shard the sources over a pool of processes
+        workers: int, default: None
+            Number of processes, the number of CPUs if not given
+    Returns:
+        betweenness, bound: dict of str to float, float
+            Estimate for every vertex, and the error not exceeded by any of the estimates
+            with the given confidence
+    """
+
+    if not isinstance(gr, (graph, csr_graph)):
+        raise AssertionError("gr must be graph or csr_graph")
+
+    if weight not in ("weight", None):
+        raise AssertionError("weight must be either \"weight\" or None")
+
+    csr = gr.freeze()
+    n   = csr.vertex_count()
+    pivots, width = _pivots(csr, samples, epsilon, confidence, seed)
+
+    if parallel:
+        parts  = map_sources(csr, brandes_ids, pivots, workers, (weight is not None,))
+        values = [sum(values) for values in zip(*parts)]
+    else:
+        values = brandes_ids(csr, pivots, weight is not None)
+
+    scale = n / len(pivots)
+    bound = n * max(n - 2, 0) * width
+    if normalized and n > 2:
+        scale /= (n - 1) * (n - 2)
+        bound /= (n - 1) * (n - 2)
+
+    return {label: b * scale for label, b in zip(csr.labels, values)}, bound
+
+
+def top_betweenness(gr, k, samples=None, weight=None, normalized=False, epsilon=0.1, confidence=0.95,
+                    seed=None, parallel=False, workers=None):
+    """
+    Rank the k vertices of largest estimated betweenness centrality, see approximate_betweenness
+
+    Args:
+        gr: graph or csr_graph
+            -
+        k: int
+            Number of vertices wanted
+        samples, weight, normalized, epsilon, confidence, seed, parallel, workers:
+            See approximate_betweenness
+    Returns:
+        top, bound: list of (str, float), float
+            Labels and estimates of the k vertices, most central first, and the error bound
+            of the estimates. Vertices whose estimates differ by less than twice the bound
+            may be ranked in either order
+    """
+
+    estimates, bound = approximate_betweenness(gr, samples, weight, normalized, epsilon, confidence,
+                                               seed, parallel, workers)
+
+    if not 0 < k <= len(estimates):
+        raise AssertionError("k must be between 1 and the number of vertices")
+
+    return sorted(estimates.items(), key=lambda r: r[1], reverse=True)[:k], bound
+
+
+def network_density(gr):
+    """
+    Compute network density of a graph
+
+    Args:
+        gr: graph or csr_graph
+            -
+    Returns:
+        network_density: float
+    """
+
+    if not isinstance(gr, (graph, csr_graph)):
+        raise AssertionError("gr must be graph or csr_graph")
+
+    csr = gr.freeze()
+    n   = csr.vertex_count()
+
+    if csr.directed:
+        return csr.arc_count() / (n * (n - 1))
+    else:
+        loops = sum(1 for a, u in enumerate(csr.tails()) if csr.indices[a] == u)
+        return (csr.arc_count() + loops) / (n * (n - 1))
+
+
+def _strongly_connected(csr, reverse):
+    """
+    Whether every vertex of a directed frozen graph reaches every other
+    """
+    n = csr.vertex_count()
+    return n == 0 or (len(bfs_ids(csr, 0)[0]) == n and len(bfs_ids(reverse, 0)[0]) == n)
+
+
+def eccentricity_bounds_ids(csr, weighted=True, prune=None):
+    """
+    Bounding diameters algorithm on a frozen graph. Every search from a pivot w gives its exact
+    eccentricity and bounds every vertex v reached: max(d(v, w), e(w) - d(w, v)) <= e(v) <= d(v, w) + e(w).
+    The first two pivots are a double sweep from a vertex of largest degree, later pivots alternate
+    between the open vertex of largest upper bound and the one of smallest lower bound, and vertices
+    are closed once their bounds meet. Eccentricities only count reachable vertices. On directed graphs
+    that are not strongly connected the bounds do not hold and every vertex is searched
+
+    Args:
+        csr: csr_graph
+            Graph we are working with, all weights must be non-negative
+
+        weighted: bool, default: True
+            Whether paths are measured by edge weight or by number of edges
+
+        prune: str, default: None
+            "diameter" or "radius" to also close the vertices that cannot change it, so only that
+            value is known at the end. Every eccentricity is computed if not given
+
+    Returns:
+        lower, upper, searches: list of float, list of float, int
+            Bounds of the eccentricity of every vertex indexed by vertex id and the number of pivots searched
+    """
+    if prune not in ("diameter", "radius", None):
+        raise AssertionError("prune must be either \"diameter\", \"radius\" or None")
+
+    n     = csr.vertex_count()
+    inf   = float("inf")
+    lower = [0.0] * n
+    upper = [inf] * n
+    if n == 0:
+        return lower, upper, 0
+
+    search  = dijkstra_ids if weighted else bfs_ids
+    reverse = csr.transpose()
+    bounded = not csr.directed or _strongly_connected(csr, reverse)
+
+    open_     = set(range(n))
+    low, high = 0.0, inf
+    searches  = 0
+    w = max(range(n), key=csr.degree)
+
+    while True:
+        dist = search(csr, w)[0]
+        back = dist if reverse is csr else search(reverse, w)[0]
+        ecc  = max(dist.values())
+        searches += 1
+
+        lower[w] = upper[w] = ecc
+        if bounded:
+            for v, d in back.items():
+                lower[v] = max(lower[v], d, ecc - dist[v])
+                upper[v] = min(upper[v], d + ecc)
+                low  = max(low, lower[v])
+                high = min(high, upper[v])
+        low  = max(low, ecc)
+        high = min(high, ecc)
+
+        for v in list(open_):
+            if lower[v] == upper[v] or (prune == "diameter" and upper[v] <= low) or \
+               (prune == "radius" and lower[v] >= high):
+                open_.discard(v)
+
+        if not open_:
+            return lower, upper, searches
+
+        farthest = max(dist, key=dist.get)
+        if searches == 1 and farthest in open_:
+            w = farthest
+        elif (searches % 2 == 0) != (prune == "radius"):
+            w = max(open_, key=lambda v: upper[v])
+        else:
+            w = min(open_, key=lambda v: lower[v])
+
+
+def eccentricity(gr, node, weight="weight"):
+    """
+    Compute eccentricity of a vertex, the longest of its shortest paths to reachable vertices
+
+    Args:
+        gr: graph or csr_graph
+            -
+        node: vertex or str
+            -
+        weight: str, default: "weight"
+            "weight" to measure paths by edge weight, None to count edges
+    Returns:
+        eccentricity: float
+    """
+
+    if not isinstance(gr, (graph, csr_graph)):
+        raise AssertionError("gr must be graph or csr_graph")
+
+    cache = get_path_cache(gr, weight)
+    u = _vertex_id(cache.csr, node)
+
+    return max(cache.tree(u)[0].values())
+
+
+def eccentricities(gr, weight="weight"):
+    """
+    Compute eccentricity of every vertex with the bounding diameters algorithm, which usually
+    needs far fewer single-source searches than vertices, see eccentricity_bounds_ids
+
+    Args:
+        gr: graph or csr_graph
+            -
+        weight: str, default: "weight"
+            "weight" to measure paths by edge weight, None to count edges
+    Returns:
+        eccentricities: dict of str to float
+    """
+
+    if not isinstance(gr, (graph, csr_graph)):
+        raise AssertionError("gr must be graph or csr_graph")
+
+    if weight not in ("weight", None):
+        raise AssertionError("weight must be either \"weight\" or None")
+
+    csr = gr.freeze()
+    lower, _, _ = eccentricity_bounds_ids(csr, weight is not None)
+
+    return dict(zip(csr.labels, lower))
+
+
+def network_radius(gr, weight="weight"):
+    """
+    Compute network radius of a graph, the smallest eccentricity of a vertex
+
+    Args:
+        gr: graph or csr_graph
+            -
+        weight: str, default: "weight"
+            "weight" to measure paths by edge weight, None to count edges
+    Returns:
+        network_radius: float
+    """
+
+    if not isinstance(gr, (graph, csr_graph)):
+        raise AssertionError("gr must be graph or csr_graph")
+
+    if weight not in ("weight", None):
+        raise AssertionError("weight must be either \"weight\" or None")
+
+    _, upper, _ = eccentricity_bounds_ids(gr.freeze(), weight is not None, "radius")
+
+    return min(upper, default=0.0)
+
+
+def network_diameter(gr, weight="weight", parallel=False, workers=None):
+    """
+    Compute network diameter of a graph, the longest of the shortest paths between reachable pairs.
+    Sequentially it runs the bounding diameters algorithm, see eccentricity_bounds_ids
+
+    Args:
+        gr: graph or csr_graph
+            -
+        weight: str, default: "weight"
+            "weight" to measure paths by edge weight, None to count edges
+        parallel: bool, default: False
+            Whether to search from every vertex in a pool of processes instead
+        workers: int, default: None
+            Number of processes, the number of CPUs if not given
+    Returns:
+        network_diameter: float
+    """
+
+    if not isinstance(gr, (graph, csr_graph)):
+        raise AssertionError("gr must be graph or csr_graph")
+
+    if parallel:
+        _, sums = _distance_sums(gr, weight, parallel, workers)
+        return max(farthest for _, _, farthest in sums)
+
+    if weight not in ("weight", None):
+        raise AssertionError("weight must be either \"weight\" or None")
+
+    lower, _, _ = eccentricity_bounds_ids(gr.freeze(), weight is not None, "diameter")
+
+    return max(lower, default=0.0)
+
+
+def network_average_path_length(gr, weight="weight", parallel=False, workers=None):
+    """
+    Compute network average path length of a graph
+
+    Args:
+        gr: graph or csr_graph
+            -
+        weight: str, default: "weight"
+            "weight" to measure paths by edge weight, None to count edges
+        parallel: bool, default: False
+            Whether to shard the sources over a pool of processes
+        workers: int, default: None
+            Number of processes, the number of CPUs if not given
+    Returns:
+        network_average_path_length: float
+    """
+
+    if not isinstance(gr, (graph, csr_graph)):
+        raise AssertionError("gr must be graph or csr_graph")
+
+    csr, sums = _distance_sums(gr, weight, parallel, workers)
+    n = csr.vertex_count()
+
+    return sum(total for _, total, _ in sums) / (n * (n - 1))
@@ -0,0 +1,106 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from graph import csr_graph
+
+
+_shared = None
+
+
+def _attach(blocks, n, directed):
+    """
+    Pool initializer. Maps the shared arrays of a frozen graph into the worker without copying them
+    """
+    global _shared
+
+    arrays = []
+    for name, typecode, nbytes in blocks:
+        shm = shared_memory.SharedMemory(name=name)
+        arrays.append((shm, shm.buf[:nbytes].cast(typecode)))
+
+    (_, indptr), (_, indices), (_, weights) = arrays
+    _shared = csr_graph(range(n), indptr, indices, weights, None, directed)
+    _shared.cache["shm"] = [shm for shm, _ in arrays]
+
+
+def _open(path):
+    """
+    Pool initializer. Maps a graph saved with csr_graph.save into the worker
+    """
+    global _shared
+    _shared = csr_graph.load(path)
+
+
+def _run(func, sources, args):
+    return func(_shared, sources, *args)
+
+
+def chunks(sources, count):
+    """
+    Splits a sequence of sources into at most count contiguous chunks of similar size
+    """
+    sources = list(sources)
+    size    = max(1, -(-len(sources) // count))
+    return [sources[i:i + size] for i in range(0, len(sources), size)]
+
+
+def map_sources(csr, func, sources=None, workers=None, args=()):
+    """
+    Runs func over shards of the sources in a pool of processes. The arcs of the graph are
+    copied once into shared memory and every worker reads them from there, so tasks only
+    carry their shard of sources. A graph opened with csr_graph.load is mapped from its
+    file by the workers instead
+
+    Args:
+        csr: csr_graph
+            Graph we are working with
+
+        func: callable
+            Module-level function called as func(csr, sources, *args) in the workers.
+            Vertex labels are not shared, workers only see vertex ids
+
+        sources: iterable of int, default: None
+            Ids of the sources to shard, every vertex if not given
+
+        workers: int, default: None
+            Number of processes, the number of CPUs if not given
+
+        args: tuple, default: ()
+            Extra arguments passed to every call of func
+
+    Returns:
+        results: list
+            Result of func for every shard, in the order of the shards
+    """
+    if sources is None:
+        sources = range(csr.vertex_count())
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    shards = chunks(sources, 4 * workers)
+
+    if "mmap" in csr.cache:
+        with ProcessPoolExecutor(workers, initializer=_open, initargs=(csr.cache["mmap"][0],)) as pool:
+            futures = [pool.submit(_run, func, shard, args) for shard in shards]
+            return [f.result() for f in futures]
+
+    blocks     = []
+    descriptor = []
+    try:
+        for arr in (csr.indptr, csr.indices, csr.weights):
+            view = memoryview(arr)
+            data = view.cast("B")
+            shm  = shared_memory.SharedMemory(create=True, size=max(1, data.nbytes))
+            shm.buf[:data.nbytes] = data
+            blocks.append(shm)
+            descriptor.append((shm.name, view.format, data.nbytes))
+
+        with ProcessPoolExecutor(workers, initializer=_attach,
+                                 initargs=(descriptor, csr.vertex_count(), csr.directed)) as pool:
+            futures = [pool.submit(_run, func, shard, args) for shard in shards]
+            return [f.result() for f in futures]
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,848 @@
+from bisect import bisect_right
+from collections import deque
+from heapq import heappush, heappop
+from math import radians, sin, cos, asin, sqrt
+
+from graph import graph, csr_graph
+
+
+def _source_id(csr, v, name):
+    u = csr.get_id(v)
+    if u is None:
+        raise AssertionError(f"{name} must be a vertex of the graph")
+    return u
+
+
+def dijkstra_ids(csr, s, t=None):
+    """
+    Dijkstra's algorithm on a frozen graph, using a binary heap
+
+    Args:
+        csr: csr_graph
+            Graph we are working with, all weights must be non-negative
+
+        s: int
+            Id of the origin vertex
+
+        t: int, default: None
+            Id of the target vertex. The search stops as soon as its distance is final
+
+    Returns:
+        dist: dict of int to float
+            Distance to every settled vertex (every reachable one if t is None)
+
+        pred: dict of int to int
+            Arc used to reach every vertex in dist, -1 for the origin
+    """
+    indptr, indices, weights = csr.indptr, csr.indices, csr.weights
+
+    dist = {s: 0.0}
+    pred = {s: -1}
+    done = set()
+    heap = [(0.0, s)]
+
+    while heap:
+        d, u = heappop(heap)
+        if u in done:
+            continue
+        done.add(u)
+        if u == t:
+            break
+
+        for a in range(indptr[u], indptr[u + 1]):
+            v  = indices[a]
+            nd = d + weights[a]
+            if nd < dist.get(v, float("inf")):
+                dist[v] = nd
+                pred[v] = a
+                heappush(heap, (nd, v))
+
+    if t is not None:
+        dist = {u: dist[u] for u in done}
+        pred = {u: pred[u] for u in done}
+
+    return dist, pred
+
+
+def bfs_ids(csr, s):
+    """
+    Breadth-first search on a frozen graph, shortest paths by number of arcs
+
+    Args:
+        csr: csr_graph
+            Graph we are working with
+
+        s: int
+            Id of the origin vertex
+
+    Returns:
+        dist: dict of int to float
+            Number of arcs on a shortest path to every reachable vertex
+
+        pred: dict of int to int
+            Arc used to reach every vertex in dist, -1 for the origin
+    """
+    indptr, indices = csr.indptr, csr.indices
+
+    dist  = {s: 0.0}
+    pred  = {s: -1}
+    queue = deque([s])
+
+    while queue:
+        u = queue.popleft()
+        d = dist[u] + 1
+        for a in range(indptr[u], indptr[u + 1]):
+            v = indices[a]
+            if v not in dist:
+                dist[v] = d
+                pred[v] = a
+                queue.append(v)
+
+    return dist, pred
+
+
+def path_ids(csr, pred, t):
+    """
+    Rebuilds the arcs of a shortest path from a predecessor map
+
+    Args:
+        csr: csr_graph
+            Graph the predecessor map was computed on
+
+        pred: dict of int to int
+            Arc used to reach every vertex, -1 for the origin
+
+        t: int
+            Id of the last vertex of the path
+
+    Returns:
+        arcs: list of int
+            Arcs from the origin to t, empty if t was not reached
+    """
+    if t not in pred:
+        return []
+
+    tails = csr.tails()
+    arcs  = []
+    a = pred[t]
+    while a != -1:
+        arcs.append(a)
+        a = pred[tails[a]]
+
+    return arcs[::-1]
+
+
+def dijkstra(gr, orig, dest=None):
+    """
+    Dijkstra's algorithm. Finds shortest distances from the origin
+
+    Args:
+        gr: graph or csr_graph
+            Graph we are working with, all weights must be non-negative
+
+        orig: vertex or str
+            Origin vertex
+
+        dest: vertex or str, default: None
+            Destination vertex. The search stops as soon as it is reached
+
+    Returns:
+        dist: dict of str to float
+            Minimum distance to every reached vertex
+
+        pred: dict of str to str
+            Previous vertex on a shortest path to every reached vertex, None for the origin
+    """
+    if not isinstance(gr, (graph, csr_graph)):
+        raise AssertionError("gr must be graph or csr_graph")
+
+    csr = gr.freeze()
+    s = _source_id(csr, orig, "orig")
+    t = None if dest is None else _source_id(csr, dest, "dest")
+
+    dist, pred = dijkstra_ids(csr, s, t)
+
+    labels = csr.labels
+    tails  = csr.tails()
+    return ({labels[u]: d for u, d in dist.items()},
+            {labels[u]: None if a == -1 else labels[tails[a]] for u, a in pred.items()})
+
+
+def shortest_path(gr, orig, dest):
+    """
+    Shortest path between origin and destination
+
+    Args:
+        gr: graph or csr_graph
+            Graph we are working with, all weights must be non-negative
+
+        orig, dest: vertex or str
+            Origin and destination vertices
+
+    Returns:
+        dist: float
+            Length of the path, inf if destination is not reachable
+
+        path: list of str
+            Labels of the vertices on the path, empty if destination is not reachable
+    """
+    if not isinstance(gr, (graph, csr_graph)):
+        raise AssertionError("gr must be graph or csr_graph")
+
+    csr = gr.freeze()
+    s = _source_id(csr, orig, "orig")
+    t = _source_id(csr, dest, "dest")
+
+    dist, pred = dijkstra_ids(csr, s, t)
+    if t not in dist:
+        return float("inf"), []
+
+    arcs = path_ids(csr, pred, t)
+    return dist[t], [csr.labels[s]] + [csr.labels[csr.indices[a]] for a in arcs]
+
+
+def bellman_ford_ids(csr, s):
+    """
+    Queue-based Bellman-Ford algorithm (SPFA) on a frozen graph. Only vertices whose
+    distance changed are rescanned, so it stops as soon as no distance changes. A vertex
+    reached by a path of n arcs lies past a negative cycle and is no longer rescanned,
+    every vertex reachable from such vertices gets -inf once the queue is empty
+
+    Args:
+        csr: csr_graph
+            Graph we are working with, weights may be negative
+
+        s: int
+            Id of the origin vertex
+
+    Returns:
+        dist: dict of int to float
+            Distance to every reachable vertex, -inf for vertices reachable from a negative cycle
+
+        pred: dict of int to int
+            Arc used to reach every vertex in dist, -1 for the origin
+
+        cycle: list of int
+            Ids of the vertices of a negative cycle reachable from the origin, in order. None if there is none
+    """
+    indptr, indices, weights = csr.indptr, csr.indices, csr.weights
+
+    n      = csr.vertex_count()
+    inf    = float("inf")
+    dist   = {s: 0.0}
+    pred   = {s: -1}
+    length = {s: 0}
+    queued = {s}
+    queue  = deque([s])
+    cycle  = None
+    seeds  = set()
+
+    while queue:
+        u = queue.popleft()
+        queued.discard(u)
+        if u in seeds:
+            continue
+        d = dist[u]
+
+        for a in range(indptr[u], indptr[u + 1]):
+            v  = indices[a]
+            nd = d + weights[a]
+            if nd < dist.get(v, inf):
+                dist[v]   = nd
+                pred[v]   = a
+                length[v] = length[u] + 1
+                if length[v] >= n:
+                    if cycle is None:
+                        cycle = _negative_cycle(csr, pred, v)
+                    seeds.add(v)
+                elif v not in queued:
+                    queued.add(v)
+                    queue.append(v)
+
+    if seeds:
+        stack = list(seeds)
+        for u in stack:
+            dist[u] = -inf
+        while stack:
+            u = stack.pop()
+            for a in range(indptr[u], indptr[u + 1]):
+                v = indices[a]
+                if dist.get(v) != -inf:
+                    pred.setdefault(v, a)
+                    dist[v] = -inf
+                    stack.append(v)
+
+    return dist, pred, cycle
+
+
+def _negative_cycle(csr, pred, v):
+    """
+    Follows predecessor arcs from v, whose path is longer than the number of vertices,
+    and returns the cycle they run into
+    """
+    tails = csr.tails()
+    for _ in range(csr.vertex_count()):
+        v = tails[pred[v]]
+
+    cycle = [v]
+    u = tails[pred[v]]
+    while u != v:
+        cycle.append(u)
+        u = tails[pred[u]]
+
+    return cycle[::-1]
+
+
+def bellman_ford(gr, orig):
+    """
+    Bellman-Ford algorithm. Finds shortest distances from the origin on a graph
+    that may have negative weights
+
+    Args:
+        gr: graph or csr_graph
+            Graph we are working with
+
+        orig: vertex or str
+            Origin vertex
+
+    Returns:
+        dist: dict of str to float
+            Minimum distance to every reachable vertex, -inf for vertices reachable from a negative cycle
+
+        pred: dict of str to str
+            Previous vertex on a shortest path to every reachable vertex, None for the origin
+
+        cycle: list of str
+            Labels of the vertices of a negative cycle reachable from the origin, in order. None if there is none
+    """
+    if not isinstance(gr, (graph, csr_graph)):
+        raise AssertionError("gr must be graph or csr_graph")
+
+    csr = gr.freeze()
+    s = _source_id(csr, orig, "orig")
+
+    dist, pred, cycle = bellman_ford_ids(csr, s)
+
+    labels = csr.labels
+    tails  = csr.tails()
+    return ({labels[u]: d for u, d in dist.items()},
+            {labels[u]: None if a == -1 else labels[tails[a]] for u, a in pred.items()},
+            None if cycle is None else [labels[u] for u in cycle])
+
+
+def bidirectional_dijkstra_ids(csr, s, t):
+    """
+    Bidirectional Dijkstra's algorithm on a frozen graph. Searches forward from the origin
+    and backward from the target, and stops once the two frontiers cannot improve the best
+    path found where they meet
+
+    Args:
+        csr: csr_graph
+            Graph we are working with, all weights must be non-negative
+
+        s, t: int
+            Ids of the origin and target vertices
+
+    Returns:
+        dist: float
+            Length of the shortest path, inf if t is not reachable
+
+        path: list of int
+            Ids of the vertices on the path, empty if t is not reachable
+    """
+    inf    = float("inf")
+    graphs = (csr, csr.transpose())
+    dist   = ({s: 0.0}, {t: 0.0})
+    pred   = ({s: -1}, {t: -1})
+    done   = (set(), set())
+    heaps  = ([(0.0, s)], [(0.0, t)])
+
+    best, meet = (0.0, s) if s == t else (inf, None)
+
+    while heaps[0] and heaps[1] and heaps[0][0][0] + heaps[1][0][0] < best:
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        d, u = heappop(heaps[side])
+        if u in done[side]:
+            continue
+        done[side].add(u)
+
+        g, near, far = graphs[side], dist[side], dist[1 - side]
+        indptr, indices, weights = g.indptr, g.indices, g.weights
+        for a in range(indptr[u], indptr[u + 1]):
+            v  = indices[a]
+            nd = d + weights[a]
+            if nd < near.get(v, inf):
+                near[v] = nd
+                pred[side][v] = a
+                heappush(heaps[side], (nd, v))
+            if v in far and near[v] + far[v] < best:
+                best, meet = near[v] + far[v], v
+
+    if meet is None:
+        return inf, []
+
+    path = []
+    for side, g in enumerate(graphs):
+        tails = g.tails()
+        half  = []
+        v = meet
+        while pred[side][v] != -1:
+            v = tails[pred[side][v]]
+            half.append(v)
+        path.append(half)
+
+    return best, path[0][::-1] + [meet] + path[1]
+
+
+def astar_ids(csr, s, t, h):
+    """
+    A* search on a frozen graph
+
+    Args:
+        csr: csr_graph
+            Graph we are working with, all weights must be non-negative
+
+        s, t: int
+            Ids of the origin and target vertices
+
+        h: callable
+            Admissible heuristic, maps a vertex id to a lower bound of its distance to t
+
+    Returns:
+        dist: dict of int to float
+            Best known distance to every reached vertex, exact for t
+
+        pred: dict of int to int
+            Arc used to reach every vertex in dist, -1 for the origin
+    """
+    indptr, indices, weights = csr.indptr, csr.indices, csr.weights
+
+    inf   = float("inf")
+    bound = {s: h(s)}
+    dist  = {s: 0.0}
+    pred  = {s: -1}
+    heap  = [(bound[s], s)]
+
+    while heap:
+        f, u = heappop(heap)
+        d = dist[u]
+        if f > d + bound[u]:
+            continue
+        if u == t:
+            break
+
+        for a in range(indptr[u], indptr[u + 1]):
+            v  = indices[a]
+            nd = d + weights[a]
+            if nd < dist.get(v, inf):
+                if v not in bound:
+                    bound[v] = h(v)
+                dist[v] = nd
+                pred[v] = a
+                heappush(heap, (nd + bound[v], v))
+
+    return dist, pred
+
+
+def bidirectional_dijkstra(gr, orig, dest):
+    """
+    Shortest path between origin and destination found by bidirectional Dijkstra's algorithm
+
+    Args:
+        gr: graph or csr_graph
+            Graph we are working with, all weights must be non-negative
+
+        orig, dest: vertex or str
+            Origin and destination vertices
+
+    Returns:
+        dist: float
+            Length of the path, inf if destination is not reachable
+
+        path: list of str
+            Labels of the vertices on the path, empty if destination is not reachable
+    """
+    if not isinstance(gr, (graph, csr_graph)):
+        raise AssertionError("gr must be graph or csr_graph")
+
+    csr = gr.freeze()
+    s = _source_id(csr, orig, "orig")
+    t = _source_id(csr, dest, "dest")
+
+    dist, path = bidirectional_dijkstra_ids(csr, s, t)
+    return dist, [csr.labels[u] for u in path]
+
+
+def astar(gr, orig, dest, heuristic=None):
+    """
+    Shortest path between origin and destination found by A* search
+
+    Args:
+        gr: graph or csr_graph
+            Graph we are working with, all weights must be non-negative
+
+        orig, dest: vertex or str
+            Origin and destination vertices
+
+        heuristic: callable, default: None
+            Maps the labels of a vertex and of the destination to a lower bound of the
+            distance between them, e.g. great_circle(coordinates). Without it A* is Dijkstra's algorithm
+
+    Returns:
+        dist: float
+            Length of the path, inf if destination is not reachable
+
+        path: list of str
+            Labels of the vertices on the path, empty if destination is not reachable
+    """
+    if not isinstance(gr, (graph, csr_graph)):
+        raise AssertionError("gr must be graph or csr_graph")
+
+    csr = gr.freeze()
+    s = _source_id(csr, orig, "orig")
+    t = _source_id(csr, dest, "dest")
+
+    labels = csr.labels
+    if heuristic is None:
+        h = lambda u: 0.0
+    else:
+        h = lambda u: heuristic(labels[u], labels[t])
+
+    dist, pred = astar_ids(csr, s, t, h)
+    if t not in dist:
+        return float("inf"), []
+
+    arcs = path_ids(csr, pred, t)
+    return dist[t], [labels[s]] + [labels[csr.indices[a]] for a in arcs]
+
+
+def great_circle(coordinates, radius=3958.8):
+    """
+    Great-circle distance heuristic for A* search
+
+    Args:
+        coordinates: dict of str to (float, float)
+            Latitude and longitude in degrees of every vertex label. Vertices missing
+            from the table get a bound of 0
+
+        radius: float, default: 3958.8
+            Radius of the sphere, the default is the radius of the Earth in miles
+
+    Returns:
+        heuristic: callable
+            Maps two vertex labels to the great-circle distance between them
+    """
+    points = {label: (radians(lat), radians(lon)) for label, (lat, lon) in coordinates.items()}
+
+    def heuristic(a, b):
+        if a not in points or b not in points:
+            return 0.0
+        (lat1, lon1), (lat2, lon2) = points[a], points[b]
+        h = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+        return 2 * radius * asin(min(1.0, sqrt(h)))
+
+    return heuristic
+
+
+class path_cache:
+    __slots__ = ("csr", "weight", "trees")
+
+    def __init__(self, csr, weight="weight"):
+        """
+        Shortest path trees of a frozen graph, computed once per source on first use
+        and shared by everything asking for distances on the same graph
+
+        Args:
+            csr: csr_graph
+                Graph we are working with
+
+            weight: str, default: "weight"
+                "weight" for paths by edge weight, None for paths by number of edges
+        """
+        self.csr    = csr
+        self.weight = weight
+        self.trees  = dict()
+
+
+    def tree(self, s):
+        """
+        Returns the distance and predecessor maps from source id s. The predecessor of a vertex
+        is the tail and edge id of the tree edge entering it, None for s, so trees stay valid
+        on a newer frozen form of the same graph
+        """
+        tree = self.trees.get(s)
+        if tree is None:
+            dist, pred = dijkstra_ids(self.csr, s) if self.weight is not None else bfs_ids(self.csr, s)
+            tails = self.csr.tails()
+            tree  = dist, {v: None if a == -1 else (tails[a], self.__edge(a)) for v, a in pred.items()}
+            self.trees[s] = tree
+        return tree
+
+
+    def distance(self, s, t):
+        """
+        Returns the length of a shortest path between vertex ids s and t, inf if there is none
+        """
+        return self.tree(s)[0].get(t, float("inf"))
+
+
+    def path(self, s, t):
+        """
+        Returns the vertex ids on a shortest path between s and t, empty if there is none
+        """
+        pred = self.tree(s)[1]
+        if t not in pred:
+            return []
+
+        path = [t]
+        while pred[path[-1]] is not None:
+            path.append(pred[path[-1]][0])
+        return path[::-1]
+
+
+    def fill(self):
+        """
+        Computes the trees of all sources
+        """
+        for s in range(self.csr.vertex_count()):
+            self.tree(s)
+        return self
+
+
+    def update(self, arcs, old_weights):
+        """
+        Repairs every tree after some arcs were added or changed weight, recomputing only
+        the vertices whose distance can change. Vertices below a tree arc whose weight grew
+        are reattached from the rest of the tree, then improvements are propagated from the
+        heads of new and lighter arcs
+
+        Args:
+            arcs: list of int
+                Arcs of the frozen graph that are new or have a new weight
+
+            old_weights: list of int or float
+                Previous weight of every arc, None for new arcs
+        """
+        weighted = self.weight is not None
+        weights  = self.csr.weights
+
+        grown, shrunk = [], []
+        for a, old in zip(arcs, old_weights):
+            w = weights[a] if weighted else 1.0
+            if old is not None and w > (old if weighted else 1.0):
+                grown.append(a)
+            elif old is None or w < old:
+                shrunk.append(a)
+
+        for dist, pred in self.trees.values():
+            if grown:
+                self.__reattach(dist, pred, grown)
+            if shrunk:
+                self.__propagate(dist, pred, shrunk)
+
+
+    def __weight(self, a):
+        return self.csr.weights[a] if self.weight is not None else 1.0
+
+
+    def __edge(self, a):
+        return self.csr.edge_ids[a] if self.csr.edge_ids is not None else a
+
+
+    def __tail(self, a):
+        return bisect_right(self.csr.indptr, a) - 1
+
+
+    def __propagate(self, dist, pred, arcs):
+        """
+        Dijkstra's algorithm seeded with the heads of the given arcs wherever they improve a distance
+        """
+        csr = self.csr
+        inf = float("inf")
+
+        heap = []
+        for a in arcs:
+            x, y = self.__tail(a), csr.indices[a]
+            if x in dist and dist[x] + self.__weight(a) < dist.get(y, inf):
+                dist[y] = dist[x] + self.__weight(a)
+                pred[y] = (x, self.__edge(a))
+                heappush(heap, (dist[y], y))
+
+        while heap:
+            d, u = heappop(heap)
+            if d > dist[u]:
+                continue
+            for a in range(csr.indptr[u], csr.indptr[u + 1]):
+                v  = csr.indices[a]
+                nd = d + self.__weight(a)
+                if nd < dist.get(v, inf):
+                    dist[v] = nd
+                    pred[v] = (u, self.__edge(a))
+                    heappush(heap, (nd, v))
+
+
+    def __reattach(self, dist, pred, arcs):
+        """
+        Recomputes the distances of the subtrees hanging from the given arcs, using only
+        arcs entering them from the rest of the tree and arcs inside them
+        """
+        csr = self.csr
+        inf = float("inf")
+
+        roots = [csr.indices[a] for a in arcs if pred.get(csr.indices[a]) == (self.__tail(a), self.__edge(a))]
+        if not roots:
+            return
+
+        children = dict()
+        for v, p in pred.items():
+            if p is not None:
+                children.setdefault(p[0], []).append(v)
+
+        affected = set(roots)
+        stack    = list(roots)
+        while stack:
+            for v in children.get(stack.pop(), ()):
+                if v not in affected:
+                    affected.add(v)
+                    stack.append(v)
+
+        for v in affected:
+            del dist[v], pred[v]
+
+        weighted = self.weight is not None
+        reverse  = csr.transpose()
+        heap     = []
+        for v in affected:
+            for b in range(reverse.indptr[v], reverse.indptr[v + 1]):
+                x = reverse.indices[b]
+                if x in dist:
+                    nd = dist[x] + (reverse.weights[b] if weighted else 1.0)
+                    if nd < dist.get(v, inf):
+                        dist[v] = nd
+                        pred[v] = (x, reverse.edge_ids[b] if reverse.edge_ids is not None else b)
+            if v in dist:
+                heappush(heap, (dist[v], v))
+
+        while heap:
+            d, u = heappop(heap)
+            if d > dist[u]:
+                continue
+            for a in range(csr.indptr[u], csr.indptr[u + 1]):
+                v  = csr.indices[a]
+                nd = d + self.__weight(a)
+                if v in affected and nd < dist.get(v, inf):
+                    dist[v] = nd
+                    pred[v] = (u, self.__edge(a))
+                    heappush(heap, (nd, v))
+
+
+def get_path_cache(gr, weight="weight"):
+    """
+    Returns the shortest path cache of a graph. The cache lives on the frozen graph,
+    so it is dropped as soon as the graph is modified
+
+    Args:
+        gr: graph or csr_graph
+            Graph we are working with
+
+        weight: str, default: "weight"
+            "weight" for paths by edge weight, None for paths by number of edges
+
+    Returns:
+        cache: path_cache
+            Cache shared by every caller asking for the same weight
+    """
+    if not isinstance(gr, (graph, csr_graph)):
+        raise AssertionError("gr must be graph or csr_graph")
+
+    if weight not in ("weight", None):
+        raise AssertionError("weight must be either \"weight\" or None")
+
+    csr = gr.freeze()
+    key = ("paths", weight)
+    if key not in csr.cache:
+        csr.cache[key] = path_cache(csr, weight)
+    return csr.cache[key]
+
+
+def _carry_caches(gr, old, i, weight):
+    """
+    Moves the path caches of the frozen graph old onto the current frozen form of gr and
+    repairs them after the edge of id i was added or changed, weight being its previous weight
+    or None for a new edge. Trees refer to edges by id, so only the arcs of edge i are looked up
+    """
+    caches = [(key, c) for key, c in old.cache.items() if isinstance(c, path_cache)]
+    if not caches:
+        return
+
+    csr  = gr.freeze()
+    e    = gr.get_edges()[i]
+    arcs = [a for u in dict.fromkeys(csr.get_id(v) for v in e.get_endpoints())
+              for a in range(csr.indptr[u], csr.indptr[u + 1]) if csr.edge_ids[a] == i]
+
+    for key, cache in caches:
+        cache.csr = csr
+        cache.update(arcs, [weight] * len(arcs))
+        csr.cache[key] = cache
+
+
+def insert_edge(gr, v1, v2, weight=0, label=None):
+    """
+    Adds an edge to the graph like graph.add_edge, and updates its cached shortest path
+    trees instead of dropping them, see path_cache.update
+
+    Args:
+        gr: graph
+            Graph we are working with
+
+        v1, v2: vertex or str
+            Vertices to add an edge between
+
+        weight: int or float, default: 0
+            Weight of the edge
+
+        label: str, default: None
+            Label of the edge
+
+    Returns:
+        e: edge
+            The new edge, None if the graph already had it
+    """
+    if not isinstance(gr, graph):
+        raise AssertionError("gr must be graph")
+
+    old = gr.freeze()
+    e   = gr.add_edge(v1, v2, weight, label)
+    if e is not None:
+        _carry_caches(gr, old, len(gr.get_edges()) - 1, None)
+    return e
+
+
+def update_weight(gr, e, weight):
+    """
+    Changes the weight of an edge like graph.set_weight, and updates the cached shortest
+    path trees of the graph instead of dropping them, see path_cache.update
+
+    Args:
+        gr: graph
+            Graph we are working with
+
+        e: edge
+            Edge of the graph to change
+
+        weight: int or float
+            New weight of the edge
+
+    Returns:
+        e: edge
+            The changed edge
+    """
+    if not isinstance(gr, graph):
+        raise AssertionError("gr must be graph")
+
+    old    = gr.freeze()
+    before = e.get_weight()
+    gr.set_weight(e, weight)
+    if weight != before:
+        _carry_caches(gr, old, gr.get_edge_id(e), before)
+    return e